@@ -25,6 +25,13 @@ from pathlib import Path
 
 def check_pyinstaller():
     """检查 PyInstaller 是否已安装"""
+    # 检查 PyYAML 是否带有 libyaml C 扩展（影响配置加载速度）
+    try:
+        import _yaml  # noqa: F401
+    except ImportError:
+        print("! PyYAML 未启用 libyaml C 扩展，打包后的配置加载会变慢")
+        print("  建议在构建环境中安装 libyaml 开发头文件后重装 PyYAML")
+
     try:
         import PyInstaller
         print(f"✓ PyInstaller {PyInstaller.__version__} 已安装")
@@ -55,15 +62,16 @@ def run_tests():
     """运行测试"""
     print("\n[2/4] 运行测试...")
 
-    result = subprocess.run([sys.executable, "-m", "pytest", "tests/", "-v"], capture_output=True, text=True)
+    # 进程内调用 pytest，省掉一次解释器冷启动
+    import pytest
+
+    returncode = pytest.main(["tests/", "-v"])
 
-    if result.returncode == 0:
+    if returncode == 0:
         print("✓ 所有测试通过")
         return True
     else:
         print("✗ 测试失败")
-        print(result.stdout)
-        print(result.stderr)
         return False
 
 
@@ -73,20 +81,24 @@ def build_executable():
     print(f"  平台: {platform.system()}")
     print(f"  架构: {platform.machine()}")
 
-    # 运行 PyInstaller
-    result = subprocess.run(
-        [sys.executable, "-m", "PyInstaller", "clichat.spec", "--clean"],
-        capture_output=True,
-        text=True
-    )
+    # 字节码优化级别在 clichat.spec 里通过 optimize=2 指定，
+    # PyInstaller 会按该级别编译打包的模块（去除 docstring/assert），
+    # 与宿主解释器自身的 -O 级别无关
+    # 进程内调用 PyInstaller，省掉一次解释器冷启动
+    try:
+        import PyInstaller.__main__
 
-    if result.returncode == 0:
+        PyInstaller.__main__.run(["clichat.spec", "--clean"])
         print("✓ 构建完成")
         return True
-    else:
+    except SystemExit as e:
+        if e.code in (0, None):
+            print("✓ 构建完成")
+            return True
         print("✗ 构建失败")
-        print(result.stdout)
-        print(result.stderr)
+        return False
+    except Exception as e:
+        print(f"✗ 构建失败: {e}")
         return False
 
 
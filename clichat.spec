@@ -23,7 +23,10 @@ a = Analysis(
     ['clichat/__main__.py'],
     pathex=[str(root_dir)],
     binaries=[],
-    datas=[],
+    datas=[
+        ('clichat/data/default_config.yaml', 'clichat/data'),
+        ('clichat/ui/app.tcss', 'clichat/ui'),
+    ],
     hiddenimports=[
         'textual',
         'textual.app',
@@ -60,6 +63,9 @@ a = Analysis(
     win_private_assemblies=False,
     cipher=block_cipher,
     noarchive=False,
+    # 字节码优化级别 2：去除 docstring/assert，减小包体积并加快
+    # 冷启动 unmarshal（PyInstaller >= 6.0）
+    optimize=2,
 )
 
 pyz = PYZ(a.pure, a.zipped_data, cipher=block_cipher)
@@ -68,7 +74,9 @@ pyz = PYZ(a.pure, a.zipped_data, cipher=block_cipher)
 exe = EXE(
     pyz,
     a.scripts,
-    [],
+    # 运行时选项：两个 'O' 等价于 -OO，冻结后的解释器同样按优化级别
+    # 2 执行（EXE 没有 optimize 参数，运行时级别只能走 OPTIONS TOC）
+    [("O", None, "OPTION"), ("O", None, "OPTION")],
     exclude_binaries=True,
     name='clichat',
     debug=False,
@@ -4,120 +4,118 @@
 """
 
 import os
+from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
 from typing import Optional
 
-import yaml
-from pydantic import BaseModel, Field, field_validator
+# 注意：yaml 在 load_config 内部延迟导入，避免拖慢启动速度
 
 
-class LLMConfig(BaseModel):
+@lru_cache(maxsize=1)
+def _get_available_code_themes() -> Optional[tuple]:
+    """获取所有可用的 Pygments 代码主题（缓存，避免重复扫描 entry points）"""
+    try:
+        from pygments.styles import get_all_styles
+        return tuple(get_all_styles())
+    except ImportError:
+        # 如果 pygments 未安装，返回 None 表示跳过验证
+        return None
+
+
+@dataclass(slots=True)
+class LLMConfig:
     """LLM 配置"""
 
-    api_base: str = Field(..., description="API 基础地址")
-    model: str = Field(..., description="模型名称")
-    api_key: str = Field(default="ollama", description="API 密钥")
-    temperature: float = Field(default=0.7, ge=0.0, le=2.0, description="生成温度")
-    max_tokens: int = Field(default=2000, gt=0, description="最大 token 数")
-    system_prompt: str = Field(
-        default="You are a helpful AI assistant.", description="系统提示词"
-    )
+    api_base: str  # API 基础地址
+    model: str  # 模型名称
+    api_key: str = "ollama"  # API 密钥
+    temperature: float = 0.7  # 生成温度（0.0-2.0）
+    max_tokens: int = 2000  # 最大 token 数
+    system_prompt: str = "You are a helpful AI assistant."  # 系统提示词
+
+    def __post_init__(self):
+        """验证字段取值范围"""
+        if not 0.0 <= self.temperature <= 2.0:
+            raise ValueError("temperature 必须在 0.0-2.0 之间")
+        if self.max_tokens <= 0:
+            raise ValueError("max_tokens 必须大于 0")
 
 
-class AppConfig(BaseModel):
+@dataclass(slots=True)
+class AppConfig:
     """应用配置"""
 
-    history_dir: str = Field(..., description="对话历史存储目录")
-    context_strategy: str = Field(
-        default="lazy_compress", description="上下文管理策略"
-    )
-    compress_threshold: float = Field(
-        default=0.85, ge=0.0, le=1.0, description="压缩阈值（占 max_tokens 的比例）"
-    )
-    compress_summary_tokens: int = Field(
-        default=300, gt=0, description="压缩后摘要的目标长度"
-    )
-    markdown_code_theme: str = Field(
-        default="monokai", description="Markdown 代码块主题"
-    )
-    ui_theme: str = Field(
-        default="monokai", description="UI 主题"
-    )
-
-    @field_validator("context_strategy")
-    @classmethod
-    def validate_strategy(cls, v: str) -> str:
-        """验证上下文管理策略"""
+    history_dir: str  # 对话历史存储目录
+    context_strategy: str = "lazy_compress"  # 上下文管理策略
+    compress_threshold: float = 0.85  # 压缩阈值（占 max_tokens 的比例）
+    compress_summary_tokens: int = 300  # 压缩后摘要的目标长度
+    markdown_code_theme: str = "monokai"  # Markdown 代码块主题
+    ui_theme: str = "monokai"  # UI 主题
+
+    def __post_init__(self):
+        """验证字段取值"""
+        # 上下文管理策略
         allowed = ["lazy_compress", "sliding_window"]
-        if v not in allowed:
+        if self.context_strategy not in allowed:
             raise ValueError(f"context_strategy 必须是 {allowed} 之一")
-        return v
 
-    @field_validator("markdown_code_theme")
-    @classmethod
-    def validate_code_theme(cls, v: str) -> str:
-        """验证 Markdown 代码主题"""
-        # 获取所有可用主题
-        try:
-            from pygments.styles import get_all_styles
-            available_themes = list(get_all_styles())
-            if v not in available_themes:
-                raise ValueError(
-                    f"markdown_code_theme '{v}' 不是有效的主题。"
-                    f"可用主题: {', '.join(sorted(available_themes))}"
-                )
-        except ImportError:
-            # 如果 pygments 未安装，跳过验证
-            pass
-        return v
-
-    @field_validator("ui_theme")
-    @classmethod
-    def validate_ui_theme(cls, v: str) -> str:
-        """验证 UI 主题"""
-        # 获取所有可用的 Textual 主题
+        # 压缩阈值范围
+        if not 0.0 <= self.compress_threshold <= 1.0:
+            raise ValueError("compress_threshold 必须在 0.0-1.0 之间")
+        if self.compress_summary_tokens <= 0:
+            raise ValueError("compress_summary_tokens 必须大于 0")
+
+        # Markdown 代码主题（可用主题列表有缓存）
+        available_themes = _get_available_code_themes()
+        if available_themes is not None and self.markdown_code_theme not in available_themes:
+            raise ValueError(
+                f"markdown_code_theme '{self.markdown_code_theme}' 不是有效的主题。"
+                f"可用主题: {', '.join(sorted(available_themes))}"
+            )
+
+        # UI 主题：获取所有可用的 Textual 主题
         try:
             from textual.app import App
             app = App()
-            available_themes = list(app.available_themes.keys())
-            if v not in available_themes:
+            ui_themes = list(app.available_themes.keys())
+            if self.ui_theme not in ui_themes:
                 raise ValueError(
-                    f"ui_theme '{v}' 不是有效的主题。"
-                    f"可用主题: {', '.join(sorted(available_themes))}"
+                    f"ui_theme '{self.ui_theme}' 不是有效的主题。"
+                    f"可用主题: {', '.join(sorted(ui_themes))}"
                 )
         except Exception:
             # 如果获取主题列表失败，跳过验证
             pass
-        return v
 
 
-class Config(BaseModel):
+@dataclass(slots=True)
+class Config:
     """完整配置"""
 
     llm: LLMConfig
     app: AppConfig
 
+    def __post_init__(self):
+        """支持从嵌套 dict 构造（load_config 直接传入 YAML 数据）"""
+        if isinstance(self.llm, dict):
+            self.llm = LLMConfig(**self.llm)
+        if isinstance(self.app, dict):
+            self.app = AppConfig(**self.app)
 
-# 默认配置模板
-DEFAULT_CONFIG_TEMPLATE = """# CliChat 配置文件
-# 首次运行自动生成，请根据需要修改
-
-llm:
-  api_base: "http://localhost:11434/v1"    # Ollama API 地址
-  model: "qwen2.5:7b"                       # 模型名称
-  api_key: "ollama"                         # API 密钥（Ollama 默认为 "ollama"）
-  temperature: 0.7                          # 生成温度（0.0-2.0）
-  max_tokens: 2000                          # 最大 token 数
-  system_prompt: "You are a helpful AI assistant."  # 系统提示词
-
-app:
-  history_dir: "~/.clichat/history"    # 对话历史存储目录
-  context_strategy: "lazy_compress"         # 上下文管理策略
-  compress_threshold: 0.85                  # Token 达到 85% 时触发压缩
-  compress_summary_tokens: 300              # 压缩后摘要的目标长度
-  markdown_code_theme: "monokai"            # Markdown 代码块主题
-  ui_theme: "monokai"                       # UI 主题（textual-dark, nord, gruvbox, monokai 等）
-"""
+
+# 配置缓存格式版本：Config 结构变化时递增，用于作废旧缓存
+_CONFIG_CACHE_VERSION = 1
+
+# 本进程内已确保存在的目录，避免重复的 stat/mkdir 系统调用
+_dirs_ensured: set = set()
+
+
+def _ensure_dir(path: str):
+    """创建目录（每个路径在进程内只真正执行一次）"""
+    if path not in _dirs_ensured:
+        os.makedirs(path, exist_ok=True)
+        _dirs_ensured.add(path)
 
 
 def get_default_config_path() -> Path:
@@ -144,11 +142,15 @@ def create_default_config(config_path: Optional[Path] = None) -> Path:
         config_path = get_default_config_path()
 
     # 创建目录
-    config_path.parent.mkdir(parents=True, exist_ok=True)
+    _ensure_dir(str(config_path.parent))
+
+    # 默认配置模板随包分发，只在首次运行时才读取
+    from importlib.resources import files
+    template = files("clichat").joinpath("data/default_config.yaml").read_bytes()
 
     # 写入默认配置
-    with open(config_path, "w", encoding="utf-8") as f:
-        f.write(DEFAULT_CONFIG_TEMPLATE)
+    with open(config_path, "wb") as f:
+        f.write(template)
 
     return config_path
 
@@ -181,16 +183,56 @@ def load_config(config_path: Optional[str] = None) -> Config:
         print(f"首次运行，已创建默认配置文件: {path}")
         print("请编辑配置文件以设置您的 LLM API 信息")
 
-    with open(path, "r", encoding="utf-8") as f:
-        data = yaml.safe_load(f)
+    import pickle
+
+    # 尝试命中 pickle 缓存（以源文件 mtime_ns 为 key）。缓存中存的是验证过的
+    # Config 对象，unpickle 不会触发 __post_init__，命中时完全跳过解析和验证
+    cache_path = path.with_suffix(".yaml.cache")
+    mtime_ns = path.stat().st_mtime_ns
+    if cache_path.exists():
+        try:
+            with open(cache_path, "rb") as f:
+                version, cached_mtime_ns, cached_config = pickle.load(f)
+            if version == _CONFIG_CACHE_VERSION and cached_mtime_ns == mtime_ns:
+                # 历史目录在写缓存时已创建过；即使被删除，
+                # SessionManager 初始化时也会重新创建
+                return cached_config
+        except Exception:
+            # 缓存损坏或格式不兼容，回退到正常解析
+            pass
+
+    # 延迟导入 yaml：只有真正解析配置时才付出导入成本
+    import yaml
+
+    # 优先使用 libyaml 的 C 解析器（比纯 Python 解析快数倍），不可用时回退
+    yaml_loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+    # 以二进制方式读取，让 libyaml 自行处理 UTF-8 解码
+    with open(path, "rb") as f:
+        data = yaml.load(f, Loader=yaml_loader)
 
-    config = Config(**data)
+    try:
+        config = Config(**data)
+    except TypeError as e:
+        # 缺失必填字段或出现未知字段时，dataclass 抛 TypeError，统一转为 ValueError
+        raise ValueError(f"配置文件格式错误: {e}")
 
-    # 展开路径（~ -> 绝对路径）
-    history_dir = Path(config.app.history_dir).expanduser().absolute()
-    config.app.history_dir = str(history_dir)
+    # 展开路径（~ -> 绝对路径），用 os.path 字符串操作省去多个 Path 对象分配
+    history_dir = os.path.abspath(os.path.expanduser(config.app.history_dir))
+    config.app.history_dir = history_dir
 
     # 创建历史目录
-    history_dir.mkdir(parents=True, exist_ok=True)
+    _ensure_dir(history_dir)
+
+    # 写入缓存供下次启动使用（写失败不影响正常流程）
+    try:
+        with open(cache_path, "wb") as f:
+            pickle.dump(
+                (_CONFIG_CACHE_VERSION, mtime_ns, config),
+                f,
+                protocol=pickle.HIGHEST_PROTOCOL,
+            )
+    except (OSError, pickle.PicklingError):
+        pass
 
     return config
@@ -3,6 +3,7 @@
 实现懒惰压缩策略，智能管理对话上下文。
 """
 
+import io
 from typing import Dict, List, Optional
 
 from clichat.config import AppConfig
@@ -34,6 +35,10 @@ class ContextManager:
         self.logger = get_logger(__name__)
         self._compressed_summary: Optional[str] = None  # 缓存压缩后的摘要
         self._recent_message_count = 10  # 保留最近 N 条消息
+        # 阈值只依赖配置，初始化时算好，避免每轮对话重复计算
+        self._threshold = int(
+            llm_client.config.max_tokens * config.compress_threshold
+        )
         self.logger.info(f"上下文管理器初始化: 策略={config.context_strategy}, 阈值={config.compress_threshold}")
 
     async def get_context_messages(
@@ -49,9 +54,10 @@ class ContextManager:
         Returns:
             处理后的消息列表，可能包含压缩的历史摘要
         """
-        max_tokens = self.llm_client.config.max_tokens
-        threshold = int(max_tokens * self.config.compress_threshold)
+        threshold = self._threshold
 
+        # total_tokens 由 SessionManager 在每次 save_message 时增量维护，
+        # 这里直接读取，不重新遍历消息计数
         messages = session["messages"]
         total_tokens = session["total_tokens"] + current_input_tokens
 
@@ -120,10 +126,14 @@ class ContextManager:
         """
         self.logger.info(f"开始压缩消息: 消息数={len(messages)}")
 
-        # 构造对话文本
-        conversation_text = "\n\n".join(
-            [f"{msg['role']}: {msg['content']}" for msg in messages]
-        )
+        # 构造对话文本（StringIO 直接写缓冲，避免 N 个中间 f-string 再 join）
+        buf = io.StringIO()
+        for msg in messages:
+            buf.write(msg["role"])
+            buf.write(": ")
+            buf.write(msg["content"])
+            buf.write("\n\n")
+        conversation_text = buf.getvalue()[:-2]  # 去掉末尾多写的分隔符
 
         # 构造压缩提示词
         compress_prompt = [
@@ -8,9 +8,6 @@ import re
 import time
 from typing import Callable, Dict, List, Awaitable
 
-import httpx
-from openai import AsyncOpenAI
-
 from clichat.config import LLMConfig
 from clichat.logger import get_logger
 from clichat.utils import count_tokens
@@ -21,13 +18,37 @@ class GenerationCancelled(Exception):
     pass
 
 
+# 预编译的标签交替模式：一次 C 层扫描同时定位 <think> 和 </think>
+_THINK_RE = re.compile(r"</?think>")
+
+# 非流式场景专用：响应已完整，一次 C 层扫描删掉整个 think 块即可
+_THINK_BLOCK_RE = re.compile(r"<think>.*?</think>", re.DOTALL)
+
+
+def _strip_think_tags(text: str) -> str:
+    """删除完整文本中的 <think>...</think> 块（含未闭合的尾部 think 块）"""
+    # 绝大多数模型不输出 <think>，先用 C 层子串查找短路掉正则
+    if "<think>" not in text:
+        return text
+    text = _THINK_BLOCK_RE.sub("", text)
+    # 与流式状态机语义一致：未闭合的 <think> 之后的内容全部丢弃
+    idx = text.find("<think>")
+    if idx != -1:
+        text = text[:idx]
+    return text
+
+# 流式输出合批参数：攒够字符数或到达刷新间隔（约 60Hz）才回调一次 on_chunk
+_FLUSH_MAX_CHARS = 64
+_FLUSH_INTERVAL = 0.016
+
+
 class ThinkTagFilter:
     """过滤 <think>...</think> 标签的状态机"""
 
     def __init__(self):
-        self.buffer = ""
-        self.in_think = False
-        self.output_buffer = ""
+        self._pending: str = ""  # 尚未确定归属的文本（可能含不完整标签）
+        self.in_think: bool = False
+        self._armed: bool = False  # 见到第一个 '<' 之前走直通快速路径
 
     def process_chunk(self, chunk: str) -> str:
         """
@@ -39,41 +60,45 @@ class ThinkTagFilter:
         Returns:
             过滤后可以输出的文本
         """
-        self.buffer += chunk
-        output = ""
-
-        while self.buffer:
+        # 快速路径：多数模型从不输出 <think>，没见过 '<' 就不值得启动状态机
+        # （"<" in chunk 在 C 层是 memchr，远比下面的扫描便宜）
+        if not self._armed:
+            if "<" not in chunk:
+                return chunk
+            self._armed = True
+
+        # 单次正则扫描（匹配在 C 层完成），用游标记录已消费的位置
+        pending = self._pending + chunk
+        pos = 0
+        end = len(pending)
+        output_parts = []
+
+        for match in _THINK_RE.finditer(pending):
             if not self.in_think:
-                # 查找 <think> 标签
-                think_start = self.buffer.find("<think>")
-                if think_start != -1:
-                    # 输出标签之前的内容
-                    output += self.buffer[:think_start]
-                    self.buffer = self.buffer[think_start + 7:]  # 跳过 <think>
+                # 普通文本中只响应 <think>；出现的 </think> 按普通文本处理
+                if match.group() == "<think>":
+                    output_parts.append(pending[pos:match.start()])
+                    pos = match.end()
                     self.in_think = True
-                else:
-                    # 检查 buffer 末尾是否可能是不完整的标签
-                    # 保留最后 6 个字符以防是 "<think" 的一部分
-                    if len(self.buffer) > 6:
-                        safe_len = len(self.buffer) - 6
-                        output += self.buffer[:safe_len]
-                        self.buffer = self.buffer[safe_len:]
-                    break
             else:
-                # 在 think 标签内，查找 </think> 标签
-                think_end = self.buffer.find("</think>")
-                if think_end != -1:
-                    # 丢弃标签内的内容，跳过 </think>
-                    self.buffer = self.buffer[think_end + 8:]
+                # think 标签内只响应 </think>；嵌套的 <think> 随内容一起丢弃
+                if match.group() == "</think>":
+                    pos = match.end()
                     self.in_think = False
-                else:
-                    # 保留最后 7 个字符以防是不完整的 "</think" 的一部分
-                    if len(self.buffer) > 8:
-                        # 丢弃 think 标签内的内容
-                        self.buffer = self.buffer[-(8):]
-                    break
 
-        return output
+        if not self.in_think:
+            # 末尾保留 6 个字符以防是不完整的 "<think" 的一部分
+            safe_end = max(pos, end - 6)
+            output_parts.append(pending[pos:safe_end])
+            pos = safe_end
+        else:
+            # 丢弃 think 标签内的内容，只保留末尾 7 个字符
+            # 以防是不完整的 "</think" 的一部分
+            pos = max(pos, end - 7)
+
+        # 只在扫描结束时做一次切片提交
+        self._pending = pending[pos:]
+        return "".join(output_parts)
 
     def finalize(self) -> str:
         """
@@ -83,9 +108,10 @@ class ThinkTagFilter:
             剩余的可输出文本
         """
         if not self.in_think:
-            output = self.buffer
-            self.buffer = ""
+            output = self._pending
+            self._pending = ""
             return output
+        self._pending = ""
         return ""
 
 
@@ -102,25 +128,41 @@ class LLMClient:
         self.config = config
         self.logger = get_logger(__name__)
 
-        # 创建禁用代理的 HTTP 客户端
+        # 延迟导入 httpx / openai：两者导入开销大，推迟到首次创建客户端时
+        import httpx
+        from openai import AsyncOpenAI
+
+        # 创建禁用代理的持久 HTTP 客户端（整个进程复用一个连接池）
         # proxy=None: 显式设置不使用代理
         # trust_env=False: 忽略环境变量中的代理设置（HTTP_PROXY, HTTPS_PROXY 等）
-        http_client = httpx.AsyncClient(
-            proxy=None,  # 显式禁用代理
+        # limits: 保持 keep-alive 连接，标题生成和对话复用同一条 TCP 连接
+        # retries=2: 连接层瞬时失败（如服务刚重启）在 transport 内部重试，
+        # 不会把错误抛给调用方再走一遍完整的请求流程
+        self._http_client = httpx.AsyncClient(
+            transport=httpx.AsyncHTTPTransport(
+                retries=2,
+                proxy=None,  # 显式禁用代理
+                limits=httpx.Limits(
+                    max_keepalive_connections=8,
+                    keepalive_expiry=300,
+                ),
+            ),
             trust_env=False,  # 忽略环境变量
-            timeout=60.0,  # 设置超时时间
+            timeout=httpx.Timeout(60.0, connect=5.0),  # 整体 60s，连接 5s
         )
 
         self.client = AsyncOpenAI(
             api_key=config.api_key,
             base_url=config.api_base,
-            http_client=http_client,
+            http_client=self._http_client,
         )
         self.logger.info(f"LLM 客户端初始化: 模型={config.model}, API地址={config.api_base}, 已禁用代理")
 
     async def close(self):
         """关闭客户端连接"""
         await self.client.close()
+        # http_client 是我们自己创建的，openai 不负责关闭它
+        await self._http_client.aclose()
 
     async def chat_stream(
         self,
@@ -142,13 +184,18 @@ class LLMClient:
         Raises:
             Exception: API 调用错误
         """
-        # 计算输入 token 数
-        input_tokens = sum(count_tokens(msg["content"]) for msg in messages)
+        # 计算输入 token 数（优先用 SessionManager 写入的缓存值，避免重复估算）
+        input_tokens = sum(
+            msg.get("tokens") or count_tokens(msg["content"]) for msg in messages
+        )
         self.logger.info(f"开始流式 LLM 调用: 消息数={len(messages)}, 输入tokens={input_tokens}")
 
         start_time = time.time()
-        full_response = ""
+        # 完整回复按片段累积，返回前只 join 一次（避免逐段字符串拼接的重复拷贝）
+        response_parts = []
         think_filter = ThinkTagFilter()
+        stream = None
+        producer_task = None
 
         try:
             stream = await self.client.chat.completions.create(
@@ -159,38 +206,75 @@ class LLMClient:
                 stream=True,
             )
 
-            async for chunk in stream:
-                # 检查是否被用户取消
-                if is_cancelled and is_cancelled():
-                    self.logger.info("检测到用户取消信号，中断流式生成")
-                    raise GenerationCancelled()
-
-                if chunk.choices[0].delta.content:
-                    content = chunk.choices[0].delta.content
+            # 生产者-消费者解耦：网络读取以线速写入有界队列，
+            # 渲染侧按显示速度消费，终端慢时不会反压 TCP 读取
+            queue: asyncio.Queue = asyncio.Queue(maxsize=64)
+
+            async def _produce():
+                """读 SSE 流并过滤 think 标签，结果写入队列（None 表示结束）"""
+                try:
+                    async for chunk in stream:
+                        # 检查是否被用户取消
+                        if is_cancelled and is_cancelled():
+                            self.logger.info("检测到用户取消信号，中断流式生成")
+                            raise GenerationCancelled()
+
+                        # 只走一次 pydantic 属性链（choices[0].delta.content 每层都有开销）
+                        content = chunk.choices[0].delta.content
+                        if content:
+                            # 通过过滤器处理，移除 <think>...</think> 标签
+                            filtered_content = think_filter.process_chunk(content)
+                            if filtered_content:
+                                await queue.put(filtered_content)
+
+                    # 处理结束，输出剩余 buffer
+                    remaining = think_filter.finalize()
+                    if remaining:
+                        await queue.put(remaining)
+                finally:
+                    await queue.put(None)
+
+            producer_task = asyncio.create_task(_produce())
+
+            # 消费侧合批：短时间内到达的 token 合并成一次 on_chunk 回调，
+            # 把渲染/写终端的次数从每 token 一次降到约 60Hz
+            loop = asyncio.get_running_loop()
+            pending_parts = []
+            pending_len = 0
+            next_flush = loop.time() + _FLUSH_INTERVAL
+
+            while True:
+                item = await queue.get()
+                if item is None:
+                    break
 
-                    # 通过过滤器处理，移除 <think>...</think> 标签
-                    filtered_content = think_filter.process_chunk(content)
+                # 如果是第一个有效输出，去除前导空格
+                if not response_parts:
+                    item = item.lstrip()
+                    if not item:
+                        continue
 
-                    # 如果是第一个有效输出，去除前导空格
-                    if filtered_content and not full_response:
-                        filtered_content = filtered_content.lstrip()
+                response_parts.append(item)
+                pending_parts.append(item)
+                pending_len += len(item)
 
-                    if filtered_content:
-                        full_response += filtered_content
-                        await on_chunk(filtered_content)
+                # 攒够字符数或到达刷新间隔才真正回调
+                now = loop.time()
+                if pending_len >= _FLUSH_MAX_CHARS or now >= next_flush:
+                    await on_chunk("".join(pending_parts))
+                    pending_parts.clear()
+                    pending_len = 0
+                    next_flush = now + _FLUSH_INTERVAL
 
-                # 让出控制权，允许事件循环处理其他事件（如键盘输入）
-                await asyncio.sleep(0)
+            # 刷出最后一批
+            if pending_parts:
+                await on_chunk("".join(pending_parts))
 
-            # 处理结束，输出剩余 buffer
-            remaining = think_filter.finalize()
-            if remaining:
-                if not full_response:
-                    remaining = remaining.lstrip()
-                full_response += remaining
-                await on_chunk(remaining)
+            # 生产者若因取消/API 错误退出，在这里重新抛出
+            await producer_task
 
             # 计算输出 token 数和响应时间
+            full_response = "".join(response_parts)
             output_tokens = count_tokens(full_response)
             elapsed_time = time.time() - start_time
             self.logger.info(
@@ -200,12 +284,31 @@ class LLMClient:
 
         except GenerationCancelled:
             # 用户主动取消生成
+            partial_response = "".join(response_parts)
             elapsed_time = time.time() - start_time
-            self.logger.info(f"流式生成被用户取消, 已生成tokens={count_tokens(full_response)}, 耗时={elapsed_time:.2f}s")
+            self.logger.info(f"流式生成被用户取消, 已生成tokens={count_tokens(partial_response)}, 耗时={elapsed_time:.2f}s")
+            # 立即关闭 HTTP 流，让服务端停止继续生成（省 token 和带宽）
+            await stream.close()
             # 不抛出异常，返回已生成的内容
-            return full_response
+            return partial_response
+
+        except asyncio.CancelledError:
+            # 任务被外部 cancel()：停掉生产者并关闭 HTTP 流后再向上传播
+            if producer_task is not None:
+                producer_task.cancel()
+            if stream is not None:
+                await stream.close()
+            self.logger.info("流式生成任务被取消，已关闭 HTTP 流")
+            raise
 
         except Exception as e:
+            # 消费侧出错（如 on_chunk 回调抛出）时生产者可能还阻塞在
+            # queue.put 上：先停掉生产者并关闭 HTTP 流再抛出，
+            # 否则任务和连接会泄漏到进程结束
+            if producer_task is not None and not producer_task.done():
+                producer_task.cancel()
+            if stream is not None:
+                await stream.close()
             elapsed_time = time.time() - start_time
             self.logger.error(
                 f"流式 LLM 调用失败: {e}, 耗时={elapsed_time:.2f}s",
@@ -231,8 +334,10 @@ class LLMClient:
         Raises:
             Exception: API 调用错误
         """
-        # 计算输入 token 数
-        input_tokens = sum(count_tokens(msg["content"]) for msg in messages)
+        # 计算输入 token 数（优先用 SessionManager 写入的缓存值，避免重复估算）
+        input_tokens = sum(
+            msg.get("tokens") or count_tokens(msg["content"]) for msg in messages
+        )
         self.logger.info(f"开始非流式 LLM 调用: 消息数={len(messages)}, 输入tokens={input_tokens}")
 
         start_time = time.time()
@@ -248,10 +353,8 @@ class LLMClient:
 
             content = response.choices[0].message.content
 
-            # 过滤 <think>...</think> 标签
-            think_filter = ThinkTagFilter()
-            filtered_content = think_filter.process_chunk(content)
-            filtered_content += think_filter.finalize()
+            # 过滤 <think>...</think> 标签（响应已完整，单次正则即可）
+            filtered_content = _strip_think_tags(content)
 
             # 计算输出 token 数和响应时间
             output_tokens = count_tokens(filtered_content)
@@ -305,16 +408,15 @@ class LLMClient:
                 model=self.config.model,
                 messages=messages,
                 temperature=0.7,
-                max_tokens=self.config.max_tokens,
+                # 标题很短，用小的 token 上限减少服务端生成时间
+                max_tokens=min(256, self.config.max_tokens),
                 stream=False,
             )
 
             title = response.choices[0].message.content
 
-            # 过滤 <think>...</think> 标签
-            think_filter = ThinkTagFilter()
-            title = think_filter.process_chunk(title)
-            title += think_filter.finalize()
+            # 过滤 <think>...</think> 标签（响应已完整，单次正则即可）
+            title = _strip_think_tags(title)
 
             # 清理标题
             title = title.strip()
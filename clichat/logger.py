@@ -1,11 +1,15 @@
 """日志配置模块"""
 
+import atexit
+import functools
 import logging
 import os
+import queue
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
 
-# 全局 logger 字典，避免重复创建
-_loggers = {}
+# 后台日志线程（QueueListener），负责真正的格式化和磁盘写入
+_listener = None
 
 
 def setup_logger(log_dir: str = None, force: bool = False):
@@ -16,6 +20,8 @@ def setup_logger(log_dir: str = None, force: bool = False):
         log_dir: 日志目录路径，默认为 ~/.clichat/logs/
         force: 强制重新设置（用于测试）
     """
+    global _listener
+
     # 配置根 logger
     root_logger = logging.getLogger("clichat")
 
@@ -23,8 +29,11 @@ def setup_logger(log_dir: str = None, force: bool = False):
     if root_logger.handlers and not force:
         return
 
-    # 清除已有的 handlers（避免重复添加）
+    # 清除已有的 handlers（避免重复添加），并停掉旧的后台线程
     root_logger.handlers.clear()
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
 
     # 设置日志级别
     root_logger.setLevel(logging.INFO)
@@ -50,21 +59,43 @@ def setup_logger(log_dir: str = None, force: bool = False):
     )
     file_handler.setFormatter(formatter)
 
-    # 添加 handler 到根 logger
-    root_logger.addHandler(file_handler)
+    # 日志调用方把记录入队后立即返回，磁盘 I/O 全部在后台线程完成，
+    # 避免流式输出的异步热路径被同步写盘阻塞。
+    # 注意：QueueHandler.prepare 会在调用线程里先 format 一次（合并
+    # args/exc_info，保证入队的记录自包含、可跨线程），offload 的只是写盘
+    log_queue = queue.SimpleQueue()
+    queue_handler = QueueHandler(log_queue)
+    queue_handler.setLevel(logging.INFO)
+    root_logger.addHandler(queue_handler)
+
+    _listener = QueueListener(log_queue, file_handler, respect_handler_level=True)
+    _listener.start()
+
+
+def shutdown_logger():
+    """停止后台日志线程，把队列中尚未落盘的日志全部写出"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
 
 
+# 进程退出时确保队列中的日志不丢失
+atexit.register(shutdown_logger)
+
+
+@functools.lru_cache(maxsize=None)
 def get_logger(name: str) -> logging.Logger:
     """
     获取 logger 实例
 
+    logging.getLogger 本身已有全局缓存，这里再套一层 lru_cache
+    把重复调用变成 C 级缓存命中，省去字符串拼接。
+
     Args:
         name: logger 名称（通常使用 __name__）
 
     Returns:
         Logger 实例
     """
-    if name not in _loggers:
-        _loggers[name] = logging.getLogger(f"clichat.{name}")
-
-    return _loggers[name]
+    return logging.getLogger("clichat." + name)
@@ -4,14 +4,43 @@
 """
 
 import json
+import os
+import tempfile
+import threading
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Optional
 
+try:
+    # orjson（C 实现）比 stdlib json 快 3-10 倍，安装了就优先使用
+    import orjson
+except ImportError:
+    orjson = None
+
 from clichat.logger import get_logger
 from clichat.utils import count_tokens, truncate_text
 
 
+def _dumps_session(session_data: Dict) -> bytes:
+    """序列化会话数据为紧凑 JSON 字节串（非 ASCII 原样输出）
+
+    不带缩进可以省下 ~30% 的文件体积，每次 save_message 的写入量
+    和后续 list_sessions/search_sessions 的解析量都随之下降。
+    """
+    if orjson is not None:
+        return orjson.dumps(session_data)
+    return json.dumps(
+        session_data, ensure_ascii=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def _loads_session(raw: bytes) -> Dict:
+    """反序列化会话 JSON 字节串"""
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
 class SessionManager:
     """会话管理器"""
 
@@ -27,6 +56,14 @@ class SessionManager:
         self.logger = get_logger(__name__)
         # 内存中的 session 缓存（用于延迟保存）
         self._memory_sessions: Dict[str, Dict] = {}
+        # 已落盘会话的解析结果缓存：save_message 每轮都要 load-modify-save，
+        # 缓存命中时跳过整个 JSON 解析，追加消息变成 O(1) 的字典操作
+        self._session_cache: Dict[str, Dict] = {}
+        # 写入锁：save_message / update_title 会被 asyncio.to_thread 放到
+        # 不同线程执行（如首条消息时回复保存与标题生成并发），整个
+        # load-modify-save 周期必须互斥，否则两个线程会同时改缓存里的
+        # 同一个 dict 并竞争写同一个会话文件
+        self._write_lock = threading.Lock()
         self.logger.info(f"会话管理器初始化: 历史目录={self.history_dir}")
 
     def create_session(self, system_prompt: str, save_to_disk: bool = True) -> str:
@@ -40,24 +77,30 @@ class SessionManager:
         Returns:
             session_id: 新创建的会话 ID
         """
+        # 只取一次当前时间：会话 ID 和各时间戳字段共用，省去重复的
+        # 系统调用和 datetime 对象分配
+        now = datetime.now()
+        now_iso = now.isoformat()
+
         # 生成会话 ID（基于时间戳，包含微秒以确保唯一性）
-        session_id = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+        session_id = now.strftime("%Y%m%d_%H%M%S_%f")
 
         # 初始化会话数据
+        system_tokens = count_tokens(system_prompt)
         session_data = {
             "session_id": session_id,
-            "created_at": datetime.now().isoformat(),
-            "updated_at": datetime.now().isoformat(),
+            "created_at": now_iso,
+            "updated_at": now_iso,
             "title": "(空会话)",  # 默认标题，首次用户消息后会更新
             "messages": [
                 {
                     "role": "system",
                     "content": system_prompt,
-                    "timestamp": datetime.now().isoformat(),
-                    "tokens": count_tokens(system_prompt),
+                    "timestamp": now_iso,
+                    "tokens": system_tokens,
                 }
             ],
-            "total_tokens": count_tokens(system_prompt),
+            "total_tokens": system_tokens,
         }
 
         if save_to_disk:
@@ -89,16 +132,21 @@ class SessionManager:
             self.logger.info(f"从内存加载会话: session_id={session_id}")
             return self._memory_sessions[session_id]
 
-        # 再检查文件
+        # 再检查已落盘会话的解析缓存
+        if session_id in self._session_cache:
+            return self._session_cache[session_id]
+
+        # 最后检查文件
         session_path = self.history_dir / f"session_{session_id}.json"
 
         if not session_path.exists():
             self.logger.warning(f"会话不存在: session_id={session_id}")
             raise FileNotFoundError(f"会话不存在: {session_id}")
 
-        with open(session_path, "r", encoding="utf-8") as f:
-            session_data = json.load(f)
+        with open(session_path, "rb") as f:
+            session_data = _loads_session(f.read())
             self.logger.info(f"从文件加载会话: session_id={session_id}")
+            self._session_cache[session_id] = session_data
             return session_data
 
     def list_sessions(self, limit: Optional[int] = None) -> List[Dict]:
@@ -112,12 +160,55 @@ class SessionManager:
             会话摘要列表，每个元素包含 session_id, title, updated_at
         """
         sessions = []
+        has_meta = set()
+
+        # 用 os.scandir 一次遍历目录：相比 Path.glob 省去 fnmatch 匹配
+        # 和逐项 Path 对象分配，大目录下枚举成本显著降低
+        meta_paths = []
+        json_paths = []
+        with os.scandir(self.history_dir) as it:
+            for entry in it:
+                name = entry.name
+                if not name.startswith("session_"):
+                    continue
+                if name.endswith(".meta"):
+                    # 去掉 "session_" 前缀和 ".meta" 后缀即 session_id
+                    meta_paths.append((name[8:-5], entry.path))
+                elif name.endswith(".json"):
+                    # 去掉 "session_" 前缀和 ".json" 后缀即 session_id
+                    json_paths.append((name[8:-5], entry.path))
+
+        # 会话本体存在的 id 集合：用户手动删过 .json 时边车可能残留，
+        # 没有本体的 meta 会产生选不进去的幽灵会话，必须跳过
+        json_ids = {session_id for session_id, _ in json_paths}
+
+        # 优先读 meta 边车文件（几十字节），不用解析完整消息体
+        for session_id, meta_path in meta_paths:
+            if session_id not in json_ids:
+                continue
+            try:
+                with open(meta_path, "rb") as f:
+                    meta = _loads_session(f.read())
+                sessions.append(
+                    {
+                        "session_id": meta["session_id"],
+                        "title": meta["title"],
+                        "updated_at": meta["updated_at"],
+                        "created_at": meta["created_at"],
+                        "message_count": meta["message_count"],
+                    }
+                )
+                has_meta.add(meta["session_id"])
+            except (ValueError, KeyError):
+                continue
 
-        # 添加磁盘上的会话
-        for session_path in self.history_dir.glob("session_*.json"):
+        # 旧版本会话没有 meta 边车，回退到解析完整文件
+        for session_id, session_path in json_paths:
+            if session_id in has_meta:
+                continue
             try:
-                with open(session_path, "r", encoding="utf-8") as f:
-                    data = json.load(f)
+                with open(session_path, "rb") as f:
+                    data = _loads_session(f.read())
                     sessions.append(
                         {
                             "session_id": data["session_id"],
@@ -127,8 +218,8 @@ class SessionManager:
                             "message_count": len(data["messages"]) - 1,  # 减去 system
                         }
                     )
-            except (json.JSONDecodeError, KeyError):
-                # 跳过损坏的文件
+            except (ValueError, KeyError):
+                # 跳过损坏的文件（json/orjson 的解析错误都是 ValueError 子类）
                 continue
 
         # 添加内存中的会话
@@ -164,10 +255,18 @@ class SessionManager:
         keyword_lower = keyword.lower()
         results = []
 
-        for session_path in self.history_dir.glob("session_*.json"):
+        # 同 list_sessions：os.scandir 手动过滤，避免 glob 的额外开销
+        session_paths = []
+        with os.scandir(self.history_dir) as it:
+            for entry in it:
+                name = entry.name
+                if name.startswith("session_") and name.endswith(".json"):
+                    session_paths.append(entry.path)
+
+        for session_path in session_paths:
             try:
-                with open(session_path, "r", encoding="utf-8") as f:
-                    data = json.load(f)
+                with open(session_path, "rb") as f:
+                    data = _loads_session(f.read())
 
                     # 搜索标题
                     if keyword_lower in data["title"].lower():
@@ -196,7 +295,7 @@ class SessionManager:
                                 }
                             )
                             break
-            except (json.JSONDecodeError, KeyError):
+            except (ValueError, KeyError):
                 continue
 
         # 按更新时间倒序排列
@@ -205,7 +304,8 @@ class SessionManager:
         return results
 
     def save_message(
-        self, session_id: str, role: str, content: str
+        self, session_id: str, role: str, content: str,
+        tokens: Optional[int] = None,
     ):
         """
         追加消息到会话
@@ -214,35 +314,41 @@ class SessionManager:
             session_id: 会话 ID
             role: 消息角色（user 或 assistant）
             content: 消息内容
+            tokens: 消息的 token 数；调用方已经算过时传入以免重复计算
 
         Raises:
             FileNotFoundError: 会话不存在
         """
-        # 加载会话
-        session_data = self.load_session(session_id)
-
-        # 添加新消息
-        tokens = count_tokens(content)
-        message = {
-            "role": role,
-            "content": content,
-            "timestamp": datetime.now().isoformat(),
-            "tokens": tokens,
-        }
-        session_data["messages"].append(message)
-
-        # 更新总 token 数
-        session_data["total_tokens"] += tokens
-
-        # 更新时间戳
-        session_data["updated_at"] = datetime.now().isoformat()
-
-        # 如果 session 在内存中，移除内存缓存（即将保存到磁盘）
-        if session_id in self._memory_sessions:
-            del self._memory_sessions[session_id]
-
-        # 保存
-        self._save_session(session_id, session_data)
+        # token 计数可以在锁外算，只有 load-modify-save 需要互斥
+        if tokens is None:
+            tokens = count_tokens(content)
+
+        with self._write_lock:
+            # 加载会话
+            session_data = self.load_session(session_id)
+
+            # 添加新消息（消息时间戳与会话更新时间共用一次 now()）
+            now_iso = datetime.now().isoformat()
+            message = {
+                "role": role,
+                "content": content,
+                "timestamp": now_iso,
+                "tokens": tokens,
+            }
+            session_data["messages"].append(message)
+
+            # 更新总 token 数和时间戳
+            session_data["total_tokens"] += tokens
+            session_data["updated_at"] = now_iso
+
+            # 如果 session 在内存中，移除内存缓存（即将保存到磁盘），
+            # 并转入解析缓存，后续 load_session/save_message 不再重新解析文件
+            if session_id in self._memory_sessions:
+                del self._memory_sessions[session_id]
+            self._session_cache[session_id] = session_data
+
+            # 保存
+            self._save_session(session_id, session_data)
 
     def delete_session(self, session_id: str):
         """
@@ -254,6 +360,9 @@ class SessionManager:
         Raises:
             FileNotFoundError: 会话不存在
         """
+        # 清除解析缓存
+        self._session_cache.pop(session_id, None)
+
         # 从内存中删除
         if session_id in self._memory_sessions:
             del self._memory_sessions[session_id]
@@ -268,6 +377,10 @@ class SessionManager:
             raise FileNotFoundError(f"会话不存在: {session_id}")
 
         session_path.unlink()
+        # 同步删除 meta 边车（旧会话可能没有）
+        meta_path = self.history_dir / f"session_{session_id}.meta"
+        if meta_path.exists():
+            meta_path.unlink()
         self.logger.info(f"删除会话（文件）: session_id={session_id}")
 
     def is_session_empty(self, session_id: str) -> bool:
@@ -316,16 +429,17 @@ class SessionManager:
             session_id: 会话 ID
             title: 新标题
         """
-        session_data = self.load_session(session_id)
-        session_data["title"] = title
-        session_data["updated_at"] = datetime.now().isoformat()
-
-        # 如果 session 在内存中，更新内存缓存
-        if session_id in self._memory_sessions:
-            self._memory_sessions[session_id] = session_data
-        else:
-            # 保存到磁盘
-            self._save_session(session_id, session_data)
+        with self._write_lock:
+            session_data = self.load_session(session_id)
+            session_data["title"] = title
+            session_data["updated_at"] = datetime.now().isoformat()
+
+            # 如果 session 在内存中，更新内存缓存
+            if session_id in self._memory_sessions:
+                self._memory_sessions[session_id] = session_data
+            else:
+                # 保存到磁盘
+                self._save_session(session_id, session_data)
 
     def _save_session(self, session_id: str, session_data: Dict):
         """
@@ -337,5 +451,37 @@ class SessionManager:
         """
         session_path = self.history_dir / f"session_{session_id}.json"
 
-        with open(session_path, "w", encoding="utf-8") as f:
-            json.dump(session_data, f, ensure_ascii=False, indent=2)
+        # 先写临时文件再 os.replace 原子替换，避免进程中断时留下半截 JSON
+        self._atomic_write(session_path, _dumps_session(session_data))
+
+        # 同步写 meta 边车，供 list_sessions 免解析完整消息体
+        meta = {
+            "session_id": session_data["session_id"],
+            "title": session_data["title"],
+            "updated_at": session_data["updated_at"],
+            "created_at": session_data["created_at"],
+            "message_count": len(session_data["messages"]) - 1,  # 减去 system
+        }
+        meta_path = self.history_dir / f"session_{session_id}.meta"
+        self._atomic_write(meta_path, _dumps_session(meta))
+
+    @staticmethod
+    def _atomic_write(path: Path, data: bytes):
+        """原子写文件：写入同目录唯一临时文件后 rename 替换目标文件
+
+        mkstemp 保证临时文件名唯一：即使两个线程同时写同一个会话，
+        各自的临时文件互不覆盖，os.replace 以后写完的为准。
+        """
+        fd, tmp_name = tempfile.mkstemp(
+            dir=path.parent, prefix=path.name + ".", suffix=".tmp"
+        )
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_name, path)
+        except OSError:
+            try:
+                os.unlink(tmp_name)
+            except OSError:
+                pass
+            raise
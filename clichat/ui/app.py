@@ -1,14 +1,19 @@
 """主应用"""
 
 import asyncio
-import time
 
 from textual import on
 from textual.app import App, ComposeResult
 from textual.binding import Binding
-from textual.containers import Container, Horizontal, Vertical
+from textual.containers import Horizontal, Vertical
 from textual.widgets import Footer
 
+try:
+    # 剪贴板支持（可选）：在模块加载时导入一次，避免每次 Ctrl+Y 都查模块
+    import pyperclip
+except ImportError:
+    pyperclip = None
+
 from clichat.config import Config, load_config
 from clichat.context_manager import ContextManager
 from clichat.llm_client import LLMClient, GenerationCancelled
@@ -25,74 +30,8 @@ from clichat.utils import count_tokens
 class ChatbotApp(App):
     """CliChat 主应用"""
 
-    CSS = """
-    Screen {
-        background: $surface;
-    }
-
-    #main {
-        height: 100%;
-        width: 100%;
-    }
-
-    #content {
-        height: 1fr;
-        width: 100%;
-    }
-
-    #chat_container {
-        width: 1fr;
-        height: 100%;
-    }
-
-    #chat_view {
-        height: 1fr;
-        border: solid $primary;
-        margin: 1;
-        padding: 1;
-    }
-
-    #chat_view .message-content {
-        margin-left: 2;
-    }
-
-    #chat_view .welcome-message {
-        text-align: center;
-        width: 100%;
-    }
-
-    /* Markdown widget 内容不要额外缩进 */
-    #chat_view Markdown {
-        margin-left: 2;
-        padding-left: 0;
-    }
-
-    /* Markdown 标题左对齐 */
-    MarkdownH1, MarkdownH2, MarkdownH3, MarkdownH4, MarkdownH5, MarkdownH6 {
-        text-align: left;
-        align-horizontal: left;
-    }
-
-    #chat_view .copy-button-container {
-        height: auto;
-        margin-left: 2;
-        margin-top: 1;
-        margin-bottom: 1;
-    }
-
-    #chat_view .copy-button {
-        width: auto;
-        min-width: 10;
-        padding: 0 2;
-    }
-
-    #input_bar {
-        height: auto;
-        border: solid $accent;
-        margin: 1;
-        padding: 1;
-    }
-    """
+    # 样式放在独立的 .tcss 文件中，不占模块源码/字节码体积
+    CSS_PATH = "app.tcss"
 
     BINDINGS = [
         Binding("ctrl+n", "new_session", "New Session", show=True),
@@ -116,9 +55,19 @@ class ChatbotApp(App):
         self.context_manager: ContextManager = None
         self.current_session_id: str = None
         self.is_generating: bool = False
+        # 常用 widget 引用（on_mount 时解析一次，省去每次 query_one 的 DOM 查找）
+        self.chat_view: ChatView = None
+        self.input_bar: InputBar = None
+        self.session_list: SessionList = None
         self.theme = "monokai"
         # 存储每个 session 的草稿内容和历史浏览状态
         self.session_drafts: dict = {}  # {session_id: {"draft": str, "history_index": int}}
+        # 会话列表缓存：None 表示失效，下次刷新时才重新扫描磁盘
+        self._sessions_cache: list = None
+        # 当前的生成 worker，Ctrl+C 时用于真正取消任务
+        self._gen_worker = None
+        # 会话列表刷新的防抖定时器
+        self._refresh_timer = None
 
     def compose(self) -> ComposeResult:
         """组合 UI 组件"""
@@ -135,6 +84,11 @@ class ChatbotApp(App):
         try:
             self.logger.info("应用开始挂载")
 
+            # 解析一次常用 widget 引用，后续处理器直接用属性访问
+            self.chat_view = self.query_one("#chat_view", ChatView)
+            self.input_bar = self.query_one("#input_bar", InputBar)
+            self.session_list = self.query_one("#session_list", SessionList)
+
             # 加载配置
             self.config = load_config()
             self.logger.info(f"配置加载成功: UI主题={self.config.app.ui_theme}, 模型={self.config.llm.model}")
@@ -143,7 +97,7 @@ class ChatbotApp(App):
             self.theme = self.config.app.ui_theme
 
             # 更新 ChatView 的代码主题
-            chat_view = self.query_one("#chat_view", ChatView)
+            chat_view = self.chat_view
             chat_view._code_theme = self.config.app.markdown_code_theme
 
             # 初始化组件
@@ -154,100 +108,124 @@ class ChatbotApp(App):
             )
             self.logger.info("核心组件初始化完成")
 
-            # 检查是否有已存在的会话
-            sessions = self.session_manager.list_sessions()
-            if sessions:
-                # 有已存在的会话，加载最新的一个
-                latest_session_id = sessions[0]["session_id"]
-                await self._load_session(latest_session_id)
-                self.logger.info(f"加载最新会话: {latest_session_id}")
-            else:
-                # 没有已存在的会话，创建新会话
-                await self.action_new_session()
-                self.logger.info("创建新会话")
-
-            # 聚焦到输入框
-            input_bar = self.query_one("#input_bar", InputBar)
+            # 聚焦到输入框（UI 立即可交互）
+            input_bar = self.input_bar
             input_bar.focus()
 
-            # 在 UI 完全初始化后刷新会话列表（确保选中状态生效）
-            self.call_after_refresh(self._refresh_session_list)
+            # 冷启动的会话扫描和最新会话加载放进 worker 执行，
+            # 首帧界面（欢迎信息）无需等待磁盘 I/O 即可渲染
+            self.run_worker(self._bootstrap_sessions(), exclusive=True)
 
             self.logger.info("应用启动完成")
 
         except FileNotFoundError as e:
             # 配置文件不存在
             self.logger.error(f"配置文件未找到: {e}")
-            chat_view = self.query_one("#chat_view", ChatView)
+            chat_view = self.chat_view
             chat_view.append_error_message(str(e))
             self.exit()
         except Exception as e:
             # 其他初始化错误
             self.logger.error(f"应用初始化失败: {e}", exc_info=True)
-            chat_view = self.query_one("#chat_view", ChatView)
+            chat_view = self.chat_view
             chat_view.append_error_message(f"Initialization error: {e}")
             self.exit()
 
+    async def _bootstrap_sessions(self):
+        """后台加载会话：有历史会话则载入最新的，否则创建新会话"""
+        try:
+            sessions = await asyncio.to_thread(self.session_manager.list_sessions)
+            self._sessions_cache = sessions  # 顺便预热会话列表缓存
+            if sessions:
+                # 有已存在的会话，加载最新的一个
+                latest_session_id = sessions[0]["session_id"]
+                await self._load_session(latest_session_id)
+                self.logger.info(f"加载最新会话: {latest_session_id}")
+            else:
+                # 没有已存在的会话，创建新会话
+                await self.action_new_session()
+                self.logger.info("创建新会话")
+
+            # 刷新会话列表（确保选中状态生效）
+            await self._refresh_session_list()
+        except Exception as e:
+            self.logger.error(f"会话初始化失败: {e}", exc_info=True)
+            chat_view = self.chat_view
+            chat_view.append_error_message(f"Initialization error: {e}")
+
     async def action_cancel(self):
         """Ctrl+C 中断生成"""
         if self.is_generating:
             self.logger.info("用户按 Ctrl+C 键，设置 is_generating = False")
             self.is_generating = False
+            # 真正取消生成任务：立即关闭 HTTP 流，而不是等下一个 chunk 到达
+            if self._gen_worker is not None:
+                self._gen_worker.cancel()
             self.notify("正在中断生成...", timeout=2.0)
 
     async def action_copy_last_message(self):
         """Ctrl+Y 复制最后一条助手消息"""
-        chat_view = self.query_one("#chat_view", ChatView)
+        chat_view = self.chat_view
         last_message = chat_view.get_last_assistant_message()
 
         if not last_message:
             return
 
+        if pyperclip is None:
+            return
+
         try:
-            import pyperclip
             pyperclip.copy(last_message)
-        except ImportError:
-            pass
         except Exception:
             pass
 
     async def action_new_session(self):
         """创建新会话"""
-        # 1. 检查当前会话是否为空
-        if self.current_session_id and self.session_manager.is_session_empty(self.current_session_id):
+        # 初始化失败（config/session_manager 未就绪）时不做任何事，
+        # 避免快捷键在退出前的窗口期触发 AttributeError
+        if self.config is None or self.session_manager is None:
+            return
+
+        # 1. 检查当前会话是否为空（可能读盘，放线程执行）
+        if self.current_session_id and await asyncio.to_thread(
+            self.session_manager.is_session_empty, self.current_session_id
+        ):
             # 当前会话为空，不需要创建新会话
             return
 
         # 2. 检查是否已有其他空会话
-        empty_session_id = self.session_manager.find_empty_session()
+        empty_session_id = await asyncio.to_thread(
+            self.session_manager.find_empty_session
+        )
         if empty_session_id:
             # 找到空会话，切换到它
             await self._load_session(empty_session_id)
             # 刷新会话列表，更新选中状态
-            self._refresh_session_list()
+            await self._refresh_session_list()
             return
 
-        # 3. 没有空会话，创建新会话（不立即保存到磁盘）
+        # 3. 没有空会话，创建新会话（不立即保存到磁盘，无 I/O）
         self.current_session_id = self.session_manager.create_session(
             self.config.llm.system_prompt, save_to_disk=False
         )
+        self._sessions_cache = None  # 会话集合变了，列表缓存失效
         self.context_manager.reset_compression()
 
         # 4. 清空当前对话显示
-        chat_view = self.query_one("#chat_view", ChatView)
+        chat_view = self.chat_view
         chat_view.clear_chat()
 
         # 更新会话列表
-        self._refresh_session_list()
+        await self._refresh_session_list()
 
     async def action_toggle_sessions(self):
         """切换会话列表显示/隐藏"""
-        session_list = self.query_one("#session_list", SessionList)
+        session_list = self.session_list
         session_list.toggle_visibility()
 
         # 如果显示会话列表，刷新列表并设置选中状态
         if not session_list.has_class("hidden"):
-            self._refresh_session_list()
+            await self._refresh_session_list()
 
     async def action_search(self):
         """打开搜索对话框"""
@@ -258,7 +236,7 @@ class ChatbotApp(App):
         if result:
             await self._load_session(result)
             # 刷新会话列表，更新选中状态
-            self._refresh_session_list()
+            await self._refresh_session_list()
 
     async def action_request_quit(self):
         """请求退出应用（显示确认对话框）"""
@@ -269,11 +247,28 @@ class ChatbotApp(App):
 
         self.push_screen(QuitScreen(), check_quit_result)
 
-    def _refresh_session_list(self):
-        """刷新会话列表"""
-        sessions = self.session_manager.list_sessions()
-        session_list = self.query_one("#session_list", SessionList)
-        session_list.update_sessions(sessions, self.current_session_id)
+    async def _refresh_session_list(self):
+        """刷新会话列表（目录枚举和 JSON 解析在线程中执行）
+
+        结果缓存在 self._sessions_cache 中，只有会话被创建/保存/改名后
+        （缓存被置为 None）才重新扫描磁盘。
+        """
+        if self._sessions_cache is None:
+            self._sessions_cache = await asyncio.to_thread(
+                self.session_manager.list_sessions
+            )
+        session_list = self.session_list
+        session_list.update_sessions(self._sessions_cache, self.current_session_id)
+
+    def _schedule_session_refresh(self):
+        """防抖刷新会话列表：100ms 窗口内的多次请求合并为一次重建
+
+        一轮对话会连续触发多次刷新（保存用户消息、标题生成、保存助手
+        回复），每次都重建列表控件没有意义，只让最后一次生效。
+        """
+        if self._refresh_timer is not None:
+            self._refresh_timer.stop()
+        self._refresh_timer = self.set_timer(0.1, self._refresh_session_list)
 
     async def _generate_title(self, user_message: str):
         """
@@ -284,9 +279,12 @@ class ChatbotApp(App):
         """
         try:
             title = await self.llm_client.generate_title(user_message)
-            self.session_manager.update_title(self.current_session_id, title)
+            await asyncio.to_thread(
+                self.session_manager.update_title, self.current_session_id, title
+            )
             # 更新会话列表
-            self._refresh_session_list()
+            self._sessions_cache = None  # 标题变了，列表缓存失效
+            self._schedule_session_refresh()
         except Exception:
             # 如果生成失败，静默忽略，保持默认标题
             pass
@@ -301,19 +299,21 @@ class ChatbotApp(App):
         try:
             # 保存当前 session 的草稿状态（如果有）
             if self.current_session_id:
-                input_bar = self.query_one("#input_bar", InputBar)
+                input_bar = self.input_bar
                 self.session_drafts[self.current_session_id] = input_bar.get_draft_state()
                 self.logger.info(f"保存 session {self.current_session_id} 的草稿状态")
 
-            # 加载会话
-            session = self.session_manager.load_session(session_id)
+            # 加载会话（冷启动时是一次完整 JSON 解析，放线程执行）
+            session = await asyncio.to_thread(
+                self.session_manager.load_session, session_id
+            )
             self.current_session_id = session_id
 
             # 重置上下文管理器
             self.context_manager.reset_compression()
 
             # 加载该会话的用户输入历史
-            input_bar = self.query_one("#input_bar", InputBar)
+            input_bar = self.input_bar
             input_bar.load_history(session["messages"])
 
             # 恢复该 session 的草稿状态
@@ -325,21 +325,16 @@ class ChatbotApp(App):
                 self.logger.info(f"session {session_id} 无草稿状态，清空输入框")
 
             # 清空当前对话显示
-            chat_view = self.query_one("#chat_view", ChatView)
+            chat_view = self.chat_view
             chat_view.clear_chat()
 
-            # 显示会话消息（跳过 system prompt）
+            # 显示会话消息（跳过 system prompt）：
+            # 批量构建 widget 并一次性挂载，不走流式路径
             if len(session["messages"]) > 1:
-                for msg in session["messages"][1:]:
-                    if msg["role"] == "user":
-                        chat_view.append_user_message(msg["content"])
-                    elif msg["role"] == "assistant":
-                        chat_view.append_assistant_message_start()
-                        chat_view.append_assistant_chunk(msg["content"])
-                        chat_view.finalize_assistant_message()
+                chat_view.load_history(session["messages"][1:])
 
         except Exception as e:
-            chat_view = self.query_one("#chat_view", ChatView)
+            chat_view = self.chat_view
             chat_view.append_error_message(f"Failed to load session: {e}")
 
     @on(SessionSelected)
@@ -348,7 +343,7 @@ class ChatbotApp(App):
         await self._load_session(message.session_id)
 
         # 将焦点返回到输入框
-        input_bar = self.query_one("#input_bar", InputBar)
+        input_bar = self.input_bar
         input_bar.focus()
 
     @on(MessageSubmitted)
@@ -357,10 +352,17 @@ class ChatbotApp(App):
         if self.is_generating:
             return
 
+        # 启动时会话在后台 worker 中加载，_bootstrap_sessions 完成前
+        # current_session_id 还是 None；此时回车没有可写入的会话，
+        # 提示后直接丢弃，避免 load_session(None) 抛错打崩消息处理
+        if self.current_session_id is None:
+            self.notify("会话正在初始化，请稍候...", timeout=2.0)
+            return
+
         user_message = message.content
 
         # 显示用户消息
-        chat_view = self.query_one("#chat_view", ChatView)
+        chat_view = self.chat_view
         chat_view.append_user_message(user_message)
 
         # 清除当前 session 的草稿状态（因为消息已提交）
@@ -368,30 +370,34 @@ class ChatbotApp(App):
             del self.session_drafts[self.current_session_id]
             self.logger.info(f"清除 session {self.current_session_id} 的草稿状态")
 
-        # 在保存之前检查是否是第一条用户消息
-        session = self.session_manager.load_session(self.current_session_id)
+        # 在保存之前检查是否是第一条用户消息（只加载一次，保存后复用同一份数据）
+        session = await asyncio.to_thread(
+            self.session_manager.load_session, self.current_session_id
+        )
         is_first_user_message = len([m for m in session["messages"] if m["role"] == "user"]) == 0
 
-        # 保存用户消息
+        # 保存用户消息（JSON 序列化和写盘放线程执行；token 数顺便传入复用）
         user_tokens = count_tokens(user_message)
-        self.session_manager.save_message(
-            self.current_session_id, "user", user_message
+        await asyncio.to_thread(
+            self.session_manager.save_message,
+            self.current_session_id, "user", user_message, user_tokens,
         )
 
-        # 刷新 session list（更新时间变了）
-        self._refresh_session_list()
-
-        # 检查是否需要生成标题
-        session = self.session_manager.load_session(self.current_session_id)
+        # 先把两个 LLM 调用都推到后台 worker 并发执行，
+        # 列表刷新只是 UI 更新，不应占用首 token 延迟
         if is_first_user_message or not session["title"]:
             self.run_worker(self._generate_title(user_message), exclusive=False)
 
         # 使用 worker 在后台运行 LLM 调用，避免阻塞主事件循环
-        self.run_worker(
+        self._gen_worker = self.run_worker(
             self._generate_response(user_tokens),
             exclusive=False
         )
 
+        # 刷新 session list（更新时间变了，列表缓存失效，防抖合并）
+        self._sessions_cache = None
+        self._schedule_session_refresh()
+
     async def _generate_response(self, user_tokens: int):
         """
         在后台 worker 中生成 LLM 响应
@@ -399,7 +405,7 @@ class ChatbotApp(App):
         Args:
             user_tokens: 用户消息的 token 数
         """
-        chat_view = self.query_one("#chat_view", ChatView)
+        chat_view = self.chat_view
 
         # 更新状态
         self.is_generating = True
@@ -409,18 +415,16 @@ class ChatbotApp(App):
 
         try:
             # 获取上下文消息（已包含刚才保存的用户消息）
-            session = self.session_manager.load_session(self.current_session_id)
+            session = await asyncio.to_thread(
+                self.session_manager.load_session, self.current_session_id
+            )
             context_messages = await self.context_manager.get_context_messages(
                 session, user_tokens
             )
 
-            # 流式请求 LLM
-            assistant_response = ""
-
+            # 流式请求 LLM（完整文本由 chat_stream 返回，无需在回调里重复累加）
             async def on_chunk(chunk: str):
                 chat_view.append_assistant_chunk(chunk)
-                nonlocal assistant_response
-                assistant_response += chunk
                 # 让出控制权，确保 UI 能响应
                 await asyncio.sleep(0)
 
@@ -435,11 +439,19 @@ class ChatbotApp(App):
 
             # 保存助手回复
             if self.is_generating:  # 如果没有被中断
-                self.session_manager.save_message(
-                    self.current_session_id, "assistant", full_response
+                await asyncio.to_thread(
+                    self.session_manager.save_message,
+                    self.current_session_id, "assistant", full_response,
                 )
-                # 刷新 session list（更新时间变了）
-                self._refresh_session_list()
+                # 刷新 session list（更新时间变了，列表缓存失效，防抖合并）
+                self._sessions_cache = None
+                self._schedule_session_refresh()
+
+        except asyncio.CancelledError:
+            # worker 被 action_cancel 真正取消：HTTP 流已在客户端关闭，
+            # 收尾当前消息展示；与标志位取消一致，不保存未完成的回复
+            self.logger.info("生成任务被取消")
+            chat_view.finalize_assistant_message()
 
         except Exception as e:
             # 错误处理
@@ -447,9 +459,19 @@ class ChatbotApp(App):
 
         finally:
             self.is_generating = False
+            self._gen_worker = None
 
 
 def run():
     """运行应用"""
+    # uvloop（基于 libuv 的 C 实现事件循环）能降低每次回调/Task 调度的
+    # 开销，对流式输出这种高频小事件的场景收益明显；
+    # 未安装或平台不支持（如 Windows）时静默回退到默认事件循环
+    try:
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        pass
+
     app = ChatbotApp()
     app.run()
@@ -1,12 +1,56 @@
 """对话显示区组件"""
 
 import math
+import re
 
 from rich.text import Text
 from textual import on
 from textual.containers import Horizontal, VerticalScroll
 from textual.widgets import Button, Markdown, Static
 
+try:
+    # 剪贴板支持（可选）：模块加载时解析一次，复制时不再走 import 查找
+    import pyperclip
+except ImportError:
+    pyperclip = None
+
+
+# 消息标签文本只有样式差异，预先构建好反复使用（Text 从不被原地修改）
+_LABEL_YOU = Text("\n● You\n", style="bold cyan")
+_LABEL_ASSISTANT_ACTIVE = Text("\n● Assistant\n", style="bold green")
+_LABEL_ASSISTANT_DONE = Text("\n● Assistant\n", style="bold rgb(0,255,0)")
+
+# 闪动动画的预计算帧：Text 对象可以复用，每个 tick 零分配、零格式化
+# 16 帧 × 0.125s = 2 秒一个周期，亮度按余弦在 0.3-1.0 之间平滑过渡
+_BLINK_STEPS = 16
+_BLINK_INTERVAL = 0.125
+_BLINK_TEXTS = [
+    Text(
+        "\n● Assistant\n",
+        style=f"bold rgb(0,{int(255 * (0.65 + 0.35 * math.cos(2 * math.pi * i / _BLINK_STEPS)))},0)",
+    )
+    for i in range(_BLINK_STEPS)
+]
+
+
+# 行首的列表项 / 有序列表标记（"- a"、"+ a"、"1. x"），字符集探测覆盖不到
+_MD_LINE_RE = re.compile(r"^\s*(?:[-+] |\d+\. )", re.MULTILINE)
+
+
+def _needs_markdown(text: str) -> bool:
+    """判断消息是否需要走 Markdown 渲染
+
+    短消息且不含任何 Markdown 标记字符时直接用纯文本渲染，
+    跳过整个 commonmark 解析 + Pygments 高亮流程。
+    """
+    if len(text) >= 200:
+        return True
+    return (
+        any(c in text for c in "`#*_>[|")
+        or "\n\n" in text
+        or _MD_LINE_RE.search(text) is not None
+    )
+
 
 class CopyButton(Button):
     """带有消息内容的复制按钮"""
@@ -23,13 +67,16 @@ class ChatView(VerticalScroll):
 
     def __init__(self, code_theme: str = "monokai", **kwargs):
         super().__init__(**kwargs)
-        self._current_assistant_message = ""
+        self._stream_parts = []  # 流式片段列表（拼接延迟到渲染时）
+        self._joined_cache = ""  # 片段拼接结果的缓存，None 表示需要重新 join
         self._last_assistant_message = ""
         self._streaming_widget = None  # 流式输出的临时 widget
         self._assistant_label = None  # 助手标签引用（用于动画）
         self._blink_timer = None  # 闪动定时器
-        self._blink_phase = 0.0  # 闪动相位（0-1）
+        self._blink_index = 0  # 当前闪动帧下标
         self._code_theme = code_theme  # Markdown 代码块主题
+        self._stream_dirty = False  # 流式内容自上次刷新后是否有变化
+        self._flush_timer = None  # 流式刷新定时器（约 60fps）
 
     def on_mount(self):
         """挂载时初始化"""
@@ -43,7 +90,7 @@ class ChatView(VerticalScroll):
             content: 用户消息内容
         """
         # 添加用户消息标签
-        label = Static(Text("\n● You\n", style="bold cyan"))
+        label = Static(_LABEL_YOU)
         self.mount(label)
         # 添加消息内容（可选择，缩进两个空格，使用配置的代码主题，左对齐）
         content_widget = Static(
@@ -58,40 +105,69 @@ class ChatView(VerticalScroll):
     def append_assistant_message_start(self):
         """开始接收助手消息（流式）"""
         # 添加助手标签
-        self._assistant_label = Static(Text("\n● Assistant\n", style="bold green"), classes="assistant-label")
+        self._assistant_label = Static(_LABEL_ASSISTANT_ACTIVE, classes="assistant-label")
         self.mount(self._assistant_label)
         # 创建流式输出的临时 widget（缩进两个空格）
         self._streaming_widget = Static("", classes="message-content")
         self.mount(self._streaming_widget)
-        self._current_assistant_message = ""
+        self._stream_parts = []
+        self._joined_cache = ""
+        self._stream_dirty = False
 
-        # 启动闪动动画
+        # 启动闪动动画和流式刷新定时器：渲染按 60fps 节流，
+        # 与 append_assistant_chunk 的调用频率解耦
         self._start_blink_animation()
+        self._flush_timer = self.set_interval(1 / 60, self._flush_stream)
 
     def append_assistant_chunk(self, chunk: str):
         """
         追加助手消息片段（流式输出）
 
+        只累积文本并打上脏标记，真正的 widget 更新和滚动由刷新定时器
+        按帧率执行，避免每个片段都触发一次完整重渲染。
+
         Args:
             chunk: 文本片段
         """
-        self._current_assistant_message += chunk
-        # 实时更新流式 widget 的内容
-        if self._streaming_widget:
-            self._streaming_widget.update(self._current_assistant_message)
-        # 自动滚动到底部
-        self.scroll_end(animate=False)
+        self._stream_parts.append(chunk)
+        self._joined_cache = None
+        self._stream_dirty = True
+
+    def _current_message(self) -> str:
+        """返回当前累积的流式文本（join 结果有缓存）"""
+        if self._joined_cache is None:
+            self._joined_cache = "".join(self._stream_parts)
+        return self._joined_cache
+
+    def _flush_stream(self):
+        """按帧刷新流式 widget（无新内容时什么都不做）"""
+        if not self._stream_dirty or self._streaming_widget is None:
+            return
+        self._stream_dirty = False
+        # 更新前记录是否停在底部：用户手动上滚查看历史时不强制拉回
+        at_bottom = self.scroll_offset.y >= self.max_scroll_y - 1
+        self._streaming_widget.update(self._current_message())
+        if at_bottom:
+            self.scroll_end(animate=False)
+
+    def _stop_flush_timer(self):
+        """停止流式刷新定时器"""
+        if self._flush_timer:
+            self._flush_timer.stop()
+            self._flush_timer = None
+        self._stream_dirty = False
 
     def finalize_assistant_message(self):
         """
         完成助手消息（完整渲染 Markdown）
         """
-        # 停止闪动动画
+        # 停止闪动动画和流式刷新定时器（最终内容直接完整渲染，无需补刷）
         self._stop_blink_animation()
+        self._stop_flush_timer()
 
         # 重置助手标签为正常状态（完全不透明）
         if self._assistant_label:
-            self._assistant_label.update(Text("\n● Assistant\n", style="bold rgb(0,255,0)"))
+            self._assistant_label.update(_LABEL_ASSISTANT_DONE)
             self._assistant_label = None
 
         # 移除流式 widget
@@ -100,16 +176,23 @@ class ChatView(VerticalScroll):
             self._streaming_widget = None
 
         # 添加最终的 Markdown 渲染版本（可选择，缩进两个空格）
-        if self._current_assistant_message:
-            content_widget = Markdown(
-                self._current_assistant_message,
-                classes="message-content"
-            )
+        final_message = self._current_message()
+        if final_message:
+            # 短纯文本消息跳过 Markdown 解析，直接用 Text 渲染
+            if _needs_markdown(final_message):
+                content_widget = Markdown(
+                    final_message,
+                    classes="message-content"
+                )
+            else:
+                content_widget = Static(
+                    Text(final_message), classes="message-content"
+                )
             self.mount(content_widget)
 
             # 添加复制按钮
             copy_button = CopyButton(
-                self._current_assistant_message,
+                final_message,
                 variant="default",
                 classes="copy-button"
             )
@@ -121,9 +204,57 @@ class ChatView(VerticalScroll):
         #self.mount(separator)
 
         # 保存最后一条助手消息
-        self._last_assistant_message = self._current_assistant_message
+        self._last_assistant_message = final_message
         # 清空当前缓冲
-        self._current_assistant_message = ""
+        self._stream_parts = []
+        self._joined_cache = ""
+
+        # 自动滚动到底部
+        self.scroll_end(animate=False)
+
+    def load_history(self, messages: list):
+        """
+        批量渲染历史消息（会话切换时使用）
+
+        与流式路径不同：不创建临时 widget、不起闪动/刷新定时器，
+        所有 widget 先在列表中构建好，最后一次 mount_all 挂载，
+        整个回放只触发一次布局。
+
+        Args:
+            messages: 消息列表（不含 system prompt）
+        """
+        widgets = []
+        last_assistant = ""
+
+        for msg in messages:
+            role = msg["role"]
+            content = msg["content"]
+            if role == "user":
+                widgets.append(Static(_LABEL_YOU))
+                widgets.append(Static(Text(content), classes="message-content"))
+            elif role == "assistant":
+                widgets.append(
+                    Static(_LABEL_ASSISTANT_DONE, classes="assistant-label")
+                )
+                if content:
+                    if _needs_markdown(content):
+                        widgets.append(Markdown(content, classes="message-content"))
+                    else:
+                        widgets.append(
+                            Static(Text(content), classes="message-content")
+                        )
+                    copy_button = CopyButton(
+                        content, variant="default", classes="copy-button"
+                    )
+                    widgets.append(
+                        Horizontal(copy_button, classes="copy-button-container")
+                    )
+                    last_assistant = content
+
+        if widgets:
+            self.mount_all(widgets)
+        if last_assistant:
+            self._last_assistant_message = last_assistant
 
         # 自动滚动到底部
         self.scroll_end(animate=False)
@@ -173,12 +304,12 @@ class ChatView(VerticalScroll):
                 success = True
             except Exception:
                 # 如果失败，尝试使用 pyperclip
-                try:
-                    import pyperclip
-                    pyperclip.copy(event.button.message_content)
-                    success = True
-                except Exception:
-                    pass
+                if pyperclip is not None:
+                    try:
+                        pyperclip.copy(event.button.message_content)
+                        success = True
+                    except Exception:
+                        pass
 
             # 如果复制成功，显示通知
             if success:
@@ -194,43 +325,29 @@ class ChatView(VerticalScroll):
 
     def clear_chat(self):
         """清空聊天记录"""
-        # 停止闪动动画
+        # 停止闪动动画和流式刷新定时器
         self._stop_blink_animation()
-        # 移除所有子 widget
-        for child in list(self.children):
-            child.remove()
+        self._stop_flush_timer()
+        # 批量移除所有子 widget（一次布局刷新，而不是每个子节点一次）
+        self.remove_children()
 
     def _start_blink_animation(self):
         """启动闪动动画"""
-        self._blink_phase = 0.0
-        # 每 0.1 秒更新一次，2 秒一个周期
-        self._blink_timer = self.set_interval(0.1, self._update_blink)
+        self._blink_index = 0
+        self._blink_timer = self.set_interval(_BLINK_INTERVAL, self._update_blink)
 
     def _stop_blink_animation(self):
         """停止闪动动画"""
         if self._blink_timer:
             self._blink_timer.stop()
             self._blink_timer = None
-        self._blink_phase = 0.0
+        self._blink_index = 0
 
     def _update_blink(self):
-        """更新闪动效果"""
+        """更新闪动效果（直接取预计算帧，无任何每 tick 分配）"""
         if not self._assistant_label:
             self._stop_blink_animation()
             return
 
-        # 更新相位（0.1秒 * 20次 = 2秒一个周期）
-        self._blink_phase = (self._blink_phase + 0.05) % 1.0
-
-        # 计算透明度（通过 cos 函数实现平滑过渡）
-        # 范围：0.3 到 1.0
-        opacity = 0.65 + 0.35 * math.cos(self._blink_phase * 2 * math.pi)
-
-        # 通过调整绿色的亮度来模拟透明度
-        # bold green 对应 RGB(0, 255, 0)
-        # 将亮度乘以 opacity
-        brightness = int(255 * opacity)
-        color = f"rgb({0},{brightness},{0})"
-
-        # 更新标签
-        self._assistant_label.update(Text("\n● Assistant\n", style=f"bold {color}"))
+        self._blink_index = (self._blink_index + 1) % _BLINK_STEPS
+        self._assistant_label.update(_BLINK_TEXTS[self._blink_index])
@@ -1,12 +1,16 @@
 """输入框组件"""
 
-from typing import List
+from collections import deque
+from typing import Deque
 
 from textual import events, on
 from textual.binding import Binding
 from textual.message import Message
 from textual.widgets import TextArea
 
+# 历史输入条数上限：超过后丢弃最旧的，内存占用有界
+_HISTORY_MAX = 500
+
 
 class MessageSubmitted(Message):
     """用户提交消息的事件"""
@@ -43,7 +47,8 @@ class InputBar(TextArea):
             show_line_numbers=False,
         )
         self._last_height = 5  # 记录上次的高度
-        self._input_history: List[str] = []  # 历史输入列表
+        self._height_timer = None  # 高度重算的防抖定时器
+        self._input_history: Deque[str] = deque(maxlen=_HISTORY_MAX)  # 历史输入（有界）
         self._history_index: int = -1  # 当前浏览位置（-1 表示在草稿）
         self._current_draft: str = ""  # 当前正在输入的草稿
 
@@ -55,8 +60,9 @@ class InputBar(TextArea):
 
     def _update_height(self) -> None:
         """更新输入框高度"""
-        # 计算行数
-        line_count = len(self.text.split("\n")) if self.text else 1
+        self._height_timer = None
+        # 行数直接读 document.line_count（O(1)），不再 split 整段文本
+        line_count = self.document.line_count
 
         # 动态调整高度：行数 + 4（2行padding + 2行额外），最小5行，最大25行
         new_height = max(5, min(line_count + 4, 25))
@@ -72,17 +78,16 @@ class InputBar(TextArea):
         if event.key in ["ctrl+enter", "ctrl+j", "ctrl+up", "ctrl+down", "ctrl+f"]:
             return
 
-        # 按键后立即更新高度
-        self._update_height()
-
         # 如果用户输入了内容（不是导航键），重置历史浏览状态
         if self._history_index != -1:
             self._history_index = -1
 
     @on(TextArea.Changed)
     def on_textarea_changed(self) -> None:
-        """文本变化事件处理"""
-        self._update_height()
+        """文本变化事件处理（高度重算做防抖，连续输入/大段粘贴只算一次）"""
+        if self._height_timer is not None:
+            self._height_timer.stop()
+        self._height_timer = self.set_timer(0.05, self._update_height)
 
     def action_submit(self):
         """提交消息的 action"""
@@ -98,8 +103,9 @@ class InputBar(TextArea):
         if not content:
             return
 
-        # 将内容加入历史
-        self._input_history.append(content)
+        # 将内容加入历史（与上一条相同时不重复记录）
+        if not self._input_history or self._input_history[-1] != content:
+            self._input_history.append(content)
         # 重置历史浏览状态
         self._history_index = -1
         self._current_draft = ""
@@ -131,10 +137,7 @@ class InputBar(TextArea):
             # 继续向前
             self._history_index -= 1
 
-        # 更新输入框内容
-        self.text = self._input_history[self._history_index]
-        # 将光标移到末尾
-        self.move_cursor_relative(rows=999, columns=999)
+        self._show_history_entry(self._input_history[self._history_index])
 
     def action_history_next(self):
         """向后浏览历史（Ctrl+Down）"""
@@ -148,13 +151,21 @@ class InputBar(TextArea):
         if self._history_index >= len(self._input_history):
             # 回到草稿状态
             self._history_index = -1
-            self.text = self._current_draft
+            self._show_history_entry(self._current_draft)
         else:
             # 显示历史记录
-            self.text = self._input_history[self._history_index]
+            self._show_history_entry(self._input_history[self._history_index])
 
-        # 将光标移到末尾
-        self.move_cursor_relative(rows=999, columns=999)
+    def _show_history_entry(self, content: str) -> None:
+        """把某条历史内容显示到输入框，光标移到末尾
+
+        内容与当前文本相同时跳过赋值：TextArea 的 text 赋值会整篇重建
+        文档，重复按 Ctrl+Up/Down 停在同一条目时没必要重建。
+        """
+        if self.text != content:
+            self.text = content
+        # 将光标移到末尾（绝对定位，不走两次相对移动）
+        self.move_cursor(self.document.end)
 
     def clear_history(self):
         """清空历史记录（切换会话时调用）"""
@@ -174,11 +185,11 @@ class InputBar(TextArea):
         self._history_index = -1
         self._current_draft = ""
 
-        # 提取所有 user 消息
+        # 提取所有 user 消息（deque 有上限，只保留最近的若干条）
         user_messages = [msg["content"] for msg in messages if msg.get("role") == "user"]
 
         # 加载到历史中
-        self._input_history.extend(user_messages)
+        self._input_history.extend(user_messages[-_HISTORY_MAX:])
 
     def get_draft_state(self) -> dict:
         """
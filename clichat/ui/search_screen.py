@@ -1,5 +1,7 @@
 """搜索对话框组件"""
 
+import asyncio
+
 from textual import on
 from textual.app import ComposeResult
 from textual.containers import Container, Vertical
@@ -7,6 +9,8 @@ from textual.message import Message
 from textual.screen import ModalScreen
 from textual.widgets import Button, Input, Label, ListItem, ListView
 
+from clichat.utils import truncate_text
+
 
 class SearchResultSelected(Message):
     """搜索结果被选中的事件"""
@@ -63,6 +67,10 @@ class SearchScreen(ModalScreen):
         super().__init__(**kwargs)
         self.session_manager = session_manager
         self.search_results = []
+        self._search_timer = None  # 搜索防抖定时器
+        # 关键词 -> 结果缓存：对话框存续期间回退/重输同一关键词直接命中
+        # （对话框关闭即销毁，不存在跨会话修改的失效问题）
+        self._search_cache = {}
 
     def compose(self) -> ComposeResult:
         """组合组件"""
@@ -80,17 +88,39 @@ class SearchScreen(ModalScreen):
 
     @on(Input.Changed, "#search_input")
     def on_search_input_changed(self, event: Input.Changed):
-        """处理搜索输入变化"""
+        """处理搜索输入变化（防抖：停顿 0.25s 后才真正搜索）"""
         keyword = event.value.strip()
 
+        # 每次按键都重置定时器，连续输入时不触发中间态搜索
+        if self._search_timer is not None:
+            self._search_timer.stop()
+            self._search_timer = None
+
         if not keyword:
             # 清空结果
             listview = self.query_one("#search_results", ListView)
             listview.clear()
             return
 
-        # 执行搜索
-        self.search_results = self.session_manager.search_sessions(keyword)
+        self._search_timer = self.set_timer(
+            0.25, lambda: self._start_search(keyword)
+        )
+
+    def _start_search(self, keyword: str):
+        """防抖定时器到期后启动搜索 worker（新搜索会取消未完成的旧搜索）"""
+        self._search_timer = None
+        self.run_worker(self._do_search(keyword), exclusive=True)
+
+    async def _do_search(self, keyword: str):
+        """执行搜索并刷新结果列表（全文扫描在线程池中进行，不阻塞界面）"""
+        cached = self._search_cache.get(keyword)
+        if cached is not None:
+            self.search_results = cached
+        else:
+            self.search_results = await asyncio.to_thread(
+                self.session_manager.search_sessions, keyword
+            )
+            self._search_cache[keyword] = self.search_results
 
         # 更新结果列表
         listview = self.query_one("#search_results", ListView)
@@ -99,23 +129,23 @@ class SearchScreen(ModalScreen):
         if not self.search_results:
             listview.append(ListItem(Label("No results found")))
         else:
+            # 先构建好所有项再一次 extend 批量挂载，避免逐项重排
+            items = []
             for result in self.search_results:
-                title = result["title"]
-                if len(title) > 50:
-                    title = title[:50] + "..."
+                # 53 = 原有的 50 字符正文 + "..."，显示宽度不变
+                title = truncate_text(result["title"], 53)
 
                 match_type = result.get("match_type", "")
                 if match_type == "title":
                     label_text = f"[Title] {title}"
                 else:
-                    preview = result.get("match_preview", "")
-                    if len(preview) > 50:
-                        preview = preview[:50] + "..."
+                    preview = truncate_text(result.get("match_preview", ""), 53)
                     label_text = f"{title}\n  {preview}"
 
                 list_item = ListItem(Label(label_text))
                 list_item.session_id = result["session_id"]
-                listview.append(list_item)
+                items.append(list_item)
+            listview.extend(items)
 
     @on(ListView.Selected, "#search_results")
     def on_result_selected(self, event: ListView.Selected):
@@ -1,11 +1,18 @@
 """会话列表侧边栏组件"""
 
+from rich.style import Style
+from rich.text import Text
 from textual import on
 from textual.app import ComposeResult
 from textual.containers import Container, VerticalScroll
 from textual.message import Message
 from textual.widgets import Button, Label, ListItem, ListView, Static
 
+from clichat.utils import truncate_text
+
+# 列表项日期行的样式：直接构建 rich Text，不走 markup 解析
+_DATE_STYLE = Style(color="#666666")
+
 
 class SessionSelected(Message):
     """会话被选中的事件"""
@@ -66,19 +73,25 @@ class SessionList(Container):
     }
     """
 
+    # ASCII art logo（类创建时求值一次，compose 直接引用）
+    _LOGO = r"""
+▄█████ ▄▄    ▄▄ ▄█████ ▄▄ ▄▄  ▄▄▄ ▄▄▄▄▄▄
+██     ██    ██ ██     ██▄██ ██▀██  ██
+▀█████ ██▄▄▄ ██ ▀█████ ██ ██ ██▀██  ██
+""".strip()
+
     def __init__(self, **kwargs):
         super().__init__(**kwargs)  # 默认显示
         self.sessions = []
+        self._listview = None  # ListView 引用，挂载后解析一次反复使用
+
+    def on_mount(self):
+        """挂载时缓存 ListView 引用（query_one 每次都要走一遍 DOM 查询）"""
+        self._listview = self.query_one("#session_listview", ListView)
 
     def compose(self) -> ComposeResult:
         """组合组件"""
-        # ASCII art logo
-        logo = r"""
-▄█████ ▄▄    ▄▄ ▄█████ ▄▄ ▄▄  ▄▄▄ ▄▄▄▄▄▄
-██     ██    ██ ██     ██▄██ ██▀██  ██
-▀█████ ██▄▄▄ ██ ▀█████ ██ ██ ██▀██  ██
-"""
-        yield Static(logo.strip(), id="session_logo")
+        yield Static(self._LOGO, id="session_logo")
         yield ListView(id="session_listview")
 
     def toggle_visibility(self):
@@ -94,39 +107,55 @@ class SessionList(Container):
             current_session_id: 当前选中的会话 ID
         """
         self.sessions = sessions
-        listview = self.query_one("#session_listview", ListView)
+        listview = self._listview
         listview.clear()
 
-        selected_index = None
-        for index, session in enumerate(sessions):
-            # 格式化标题
-            title = session["title"]
-            if len(title) > 25:
-                title = title[:25] + "..."
+        # 先在列表中构建好所有项，一次 extend 批量挂载
+        # （逐个 append 每次都会触发挂载和重排，会话多时明显卡顿）
+        items = []
+        for session in sessions:
+            # 格式化标题（28 = 原有的 25 字符正文 + "..."，显示宽度不变）
+            title = truncate_text(session["title"], 28)
 
             # 格式化时间为 YYYY-MM-DD HH:MM:SS
             # updated_at 格式: 2025-11-13T15:30:33.123456
-            updated_at = session["updated_at"][:19].replace("T", " ")  # YYYY-MM-DD HH:MM:SS
+            # 位置固定，两次切片拼接即可，不用 replace 扫描 'T'
+            raw = session["updated_at"]
+            updated_at = raw[:10] + " " + raw[11:19]
 
             # 创建列表项，在标题前加标记符号，日期使用深灰色
-            item_text = f"▸ {title}\n  [#666666]{updated_at}[/#666666]"
-            list_item = ListItem(Label(item_text, markup=True))
+            # （预构建 Text 并关闭 markup，省掉每次渲染的标记解析）
+            item_text = Text("▸ " + title + "\n")
+            item_text.append("  " + updated_at, style=_DATE_STYLE)
+            list_item = ListItem(Label(item_text, markup=False))
             list_item.session_id = session["session_id"]  # 附加 session_id
-            listview.append(list_item)
+            items.append(list_item)
+
+        if items:
+            listview.extend(items)
 
-            # 记录当前会话的索引
-            if current_session_id and session["session_id"] == current_session_id:
-                selected_index = index
+        # 当前会话的索引单独查找一次，不在构建循环里逐项比较
+        selected_index = None
+        if current_session_id:
+            selected_index = next(
+                (
+                    i
+                    for i, s in enumerate(sessions)
+                    if s["session_id"] == current_session_id
+                ),
+                None,
+            )
 
         # 所有项添加完成后，设置选中状态
-        if selected_index is not None and len(listview.children) > 0:
-            # 使用 set_timer 确保在下一个事件循环中执行
-            self.set_timer(0.01, lambda: self._select_index(selected_index))
+        if selected_index is not None:
+            # 下一次刷新后再设置选中：此时新项已完成挂载，
+            # 比 set_timer(0.01) 少一次真实计时器唤醒，也没有 10ms 延迟
+            self.call_after_refresh(self._select_index, selected_index)
 
     def _select_index(self, index: int):
         """延迟设置选中索引"""
         try:
-            listview = self.query_one("#session_listview", ListView)
+            listview = self._listview
             if index < len(listview.children):
                 listview.index = index
         except Exception:
@@ -16,6 +16,7 @@ class StatusBar(Label):
         self.current_session = None
         self.total_tokens = 0
         self.status_message = "Ready"
+        self._last_display = "Ready"  # 上次渲染的内容，内容不变时跳过刷新
 
     def update_session(self, session_id: str, title: str, tokens: int):
         """
@@ -70,4 +71,8 @@ class StatusBar(Label):
                 short_name = short_name[:MAX_SHORT_NAME_LENGTH - 3] + "..."
             parts.append(f"Session: {short_name}")
 
-        self.update(" | ".join(parts))
+        display = " | ".join(parts)
+        # 拼出来的内容没变就不触发重新渲染
+        if display != self._last_display:
+            self._last_display = display
+            self.update(display)
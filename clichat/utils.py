@@ -3,9 +3,29 @@
 提供 Token 计数、语言检测等工具函数。
 """
 
+import json
 import re
 from typing import Optional
 
+# 语言检测用的特征模式，模块加载时编译一次
+# （re 模块自带缓存，但每次调用仍有字典查找和模式串哈希的开销）
+_PYTHON_RE = re.compile(r'\b(def|import|from|class|if __name__|print\()')
+_JS_RE = re.compile(r'\b(function|const|let|var|=>|console\.log)')
+_JAVA_RE = re.compile(r'\b(public class|private|protected|void|static|extends)')
+_C_CPP_RE = re.compile(r'#include|int main\(|std::|cout|cin')
+_GO_RE = re.compile(r'\bfunc\s+\w+\(|package\s+\w+|import\s+\(')
+_RUST_RE = re.compile(r'\bfn\s+\w+|let\s+mut|impl\s+\w+|use\s+std::')
+_RUBY_RE = re.compile(r'\bdef\s+\w+|end\b|puts\s+|require\s+')
+_PHP_RE = re.compile(r'\$\w+\s*=|function\s+\w+\(')
+_SHELL_RE = re.compile(r'\b(echo|export|source|bash|sh)\b')
+# SQL/HTML 两个模式改为对 lower() 后的文本做大小写敏感匹配：
+# IGNORECASE 让引擎在每个字符上走双倍分支，一次 C 层 lower 更便宜
+_SQL_RE = re.compile(r'\b(select|insert|update|delete|create|drop|from|where)\b')
+_HTML_RE = re.compile(r'<html|<div|<body|<head|<script|<!doctype')
+_CSS_RE = re.compile(r'\{[^}]*:[^}]*\}|@media|@import')
+_YAML_RE = re.compile(r'^\w+:\s*$|^\s+-\s+\w+', re.MULTILINE)
+_MARKDOWN_RE = re.compile(r'^#{1,6}\s+|^\*\*|^```', re.MULTILINE)
+
 
 def count_tokens(text: str) -> int:
     """
@@ -14,6 +34,10 @@ def count_tokens(text: str) -> int:
     使用简单的字符数除以 4 的方法进行估算。
     这是一种快速但不精确的方法，误差约 ±20%。
 
+    这是全项目唯一的 token 计数入口（SessionManager、LLMClient、
+    ContextManager 共用），无状态、无初始化成本；如果将来换成
+    tiktoken 等真实分词器，只需要在这里改为惰性加载的共享实例。
+
     Args:
         text: 输入文本
 
@@ -43,72 +67,76 @@ def detect_code_language(code: str) -> str:
     code = code.strip()
 
     # Python
-    if re.search(r'\b(def|import|from|class|if __name__|print\()', code):
+    if _PYTHON_RE.search(code):
         return "python"
 
     # JavaScript/TypeScript
-    if re.search(r'\b(function|const|let|var|=>|console\.log)', code):
+    if _JS_RE.search(code):
         if "interface" in code or ": string" in code or ": number" in code:
             return "typescript"
         return "javascript"
 
     # Java
-    if re.search(r'\b(public class|private|protected|void|static|extends)', code):
+    if _JAVA_RE.search(code):
         return "java"
 
     # C/C++
-    if re.search(r'#include|int main\(|std::|cout|cin', code):
+    if _C_CPP_RE.search(code):
         if "std::" in code or "cout" in code:
             return "cpp"
         return "c"
 
     # Go
-    if re.search(r'\bfunc\s+\w+\(|package\s+\w+|import\s+\(', code):
+    if _GO_RE.search(code):
         return "go"
 
     # Rust
-    if re.search(r'\bfn\s+\w+|let\s+mut|impl\s+\w+|use\s+std::', code):
+    if _RUST_RE.search(code):
         return "rust"
 
     # Ruby
-    if re.search(r'\bdef\s+\w+|end\b|puts\s+|require\s+', code):
+    if _RUBY_RE.search(code):
         return "ruby"
 
     # PHP
-    if code.startswith("<?php") or re.search(r'\$\w+\s*=|function\s+\w+\(', code):
+    if code.startswith("<?php") or _PHP_RE.search(code):
         return "php"
 
     # Shell/Bash
-    if code.startswith("#!") or re.search(r'\b(echo|export|source|bash|sh)\b', code):
+    if code.startswith("#!") or _SHELL_RE.search(code):
         return "bash"
 
+    # 大小写不敏感的检查统一在 lower 后的文本上做
+    code_lower = code.lower()
+
     # SQL
-    if re.search(r'\b(SELECT|INSERT|UPDATE|DELETE|CREATE|DROP|FROM|WHERE)\b', code, re.IGNORECASE):
+    if _SQL_RE.search(code_lower):
         return "sql"
 
     # HTML
-    if re.search(r'<html|<div|<body|<head|<script|<!DOCTYPE', code, re.IGNORECASE):
+    if _HTML_RE.search(code_lower):
         return "html"
 
     # CSS
-    if re.search(r'\{[^}]*:[^}]*\}|@media|@import', code):
+    if _CSS_RE.search(code):
         return "css"
 
     # JSON
-    if code.startswith("{") or code.startswith("["):
+    # 先做廉价的结构嗅探：首尾括号不配对就不值得做完整解析
+    # （大段 dict 字面量 / CSS 等以 { 开头的非 JSON 文本可以直接跳过）
+    if code[0] in "{[" and code[-1] in "}]":
         try:
-            import json
             json.loads(code)
             return "json"
-        except:
+        except (ValueError, RecursionError):
             pass
 
     # YAML
-    if re.search(r'^\w+:\s*$|^\s+-\s+\w+', code, re.MULTILINE):
+    if _YAML_RE.search(code):
         return "yaml"
 
     # Markdown
-    if re.search(r'^#{1,6}\s+|^\*\*|^```', code, re.MULTILINE):
+    if _MARKDOWN_RE.search(code):
         return "markdown"
 
     # 默认返回 text
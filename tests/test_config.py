@@ -1,10 +1,10 @@
 """config.py 的单元测试"""
 
+import json
 import tempfile
 from pathlib import Path
 
 import pytest
-import yaml
 
 from clichat.config import Config, LLMConfig, AppConfig, load_config
 
@@ -34,26 +34,29 @@ class TestLLMConfig:
         assert config.max_tokens == 2000
         assert config.system_prompt == "You are a helpful AI assistant."
 
-    def test_temperature_validation(self):
+    @pytest.mark.parametrize(
+        "temperature, valid",
+        [(0.0, True), (2.0, True), (-0.1, False), (2.1, False)],
+    )
+    def test_temperature_validation(self, temperature, valid):
         """测试温度范围验证"""
-        # 有效范围
-        LLMConfig(api_base="http://test", model="test", temperature=0.0)
-        LLMConfig(api_base="http://test", model="test", temperature=2.0)
-
-        # 超出范围
-        with pytest.raises(ValueError):
-            LLMConfig(api_base="http://test", model="test", temperature=-0.1)
-        with pytest.raises(ValueError):
-            LLMConfig(api_base="http://test", model="test", temperature=2.1)
-
-    def test_max_tokens_validation(self):
+        if valid:
+            LLMConfig(api_base="http://test", model="test", temperature=temperature)
+        else:
+            with pytest.raises(ValueError):
+                LLMConfig(api_base="http://test", model="test", temperature=temperature)
+
+    @pytest.mark.parametrize(
+        "max_tokens, valid",
+        [(1, True), (0, False), (-100, False)],
+    )
+    def test_max_tokens_validation(self, max_tokens, valid):
         """测试 max_tokens 验证（必须 > 0）"""
-        LLMConfig(api_base="http://test", model="test", max_tokens=1)
-
-        with pytest.raises(ValueError):
-            LLMConfig(api_base="http://test", model="test", max_tokens=0)
-        with pytest.raises(ValueError):
-            LLMConfig(api_base="http://test", model="test", max_tokens=-100)
+        if valid:
+            LLMConfig(api_base="http://test", model="test", max_tokens=max_tokens)
+        else:
+            with pytest.raises(ValueError):
+                LLMConfig(api_base="http://test", model="test", max_tokens=max_tokens)
 
 
 class TestAppConfig:
@@ -88,28 +91,34 @@ class TestAppConfig:
         with pytest.raises(ValueError, match="context_strategy 必须是"):
             AppConfig(history_dir="/tmp/test", context_strategy="invalid_strategy")
 
-    def test_threshold_validation(self):
+    @pytest.mark.parametrize(
+        "threshold, valid",
+        [(0.0, True), (1.0, True), (-0.1, False), (1.1, False)],
+    )
+    def test_threshold_validation(self, threshold, valid):
         """测试阈值范围验证"""
-        # 有效范围
-        AppConfig(history_dir="/tmp/test", compress_threshold=0.0)
-        AppConfig(history_dir="/tmp/test", compress_threshold=1.0)
-
-        # 超出范围
-        with pytest.raises(ValueError):
-            AppConfig(history_dir="/tmp/test", compress_threshold=-0.1)
-        with pytest.raises(ValueError):
-            AppConfig(history_dir="/tmp/test", compress_threshold=1.1)
-
-    def test_markdown_code_theme_validation(self):
+        if valid:
+            AppConfig(history_dir="/tmp/test", compress_threshold=threshold)
+        else:
+            with pytest.raises(ValueError):
+                AppConfig(history_dir="/tmp/test", compress_threshold=threshold)
+
+    @pytest.mark.parametrize(
+        "theme, valid",
+        [
+            ("monokai", True),
+            ("github-dark", True),
+            ("dracula", True),
+            ("invalid_theme_xyz", False),
+        ],
+    )
+    def test_markdown_code_theme_validation(self, theme, valid):
         """测试 Markdown 代码主题验证"""
-        # 有效主题
-        AppConfig(history_dir="/tmp/test", markdown_code_theme="monokai")
-        AppConfig(history_dir="/tmp/test", markdown_code_theme="github-dark")
-        AppConfig(history_dir="/tmp/test", markdown_code_theme="dracula")
-
-        # 无效主题
-        with pytest.raises(ValueError, match="不是有效的主题"):
-            AppConfig(history_dir="/tmp/test", markdown_code_theme="invalid_theme_xyz")
+        if valid:
+            AppConfig(history_dir="/tmp/test", markdown_code_theme=theme)
+        else:
+            with pytest.raises(ValueError, match="不是有效的主题"):
+                AppConfig(history_dir="/tmp/test", markdown_code_theme=theme)
 
 
 class TestLoadConfig:
@@ -147,6 +156,8 @@ class TestLoadConfig:
     def test_load_valid_config(self, tmp_path):
         """测试加载有效配置"""
         # 创建临时配置文件
+        # （JSON 是 YAML 的子集，yaml.safe_load 可以直接解析；
+        #  json.dumps 比纯 Python 的 yaml.dump 快得多）
         config_file = tmp_path / "config.yaml"
         config_data = {
             "llm": {
@@ -166,7 +177,7 @@ class TestLoadConfig:
         }
 
         with open(config_file, "w", encoding="utf-8") as f:
-            yaml.dump(config_data, f)
+            f.write(json.dumps(config_data))
 
         # 加载配置
         config = load_config(str(config_file))
@@ -189,7 +200,7 @@ class TestLoadConfig:
         }
 
         with open(config_file, "w", encoding="utf-8") as f:
-            yaml.dump(config_data, f)
+            f.write(json.dumps(config_data))
 
         config = load_config(str(config_file))
 
@@ -211,7 +222,7 @@ class TestLoadConfig:
         }
 
         with open(config_file, "w", encoding="utf-8") as f:
-            yaml.dump(config_data, f)
+            f.write(json.dumps(config_data))
 
         # 确保目录不存在
         assert not history_dir.exists()
@@ -234,7 +245,7 @@ class TestLoadConfig:
         }
 
         with open(config_file, "w", encoding="utf-8") as f:
-            yaml.dump(config_data, f)
+            f.write(json.dumps(config_data))
 
         with pytest.raises(ValueError):
             load_config(str(config_file))
@@ -254,7 +265,7 @@ class TestLoadConfig:
         }
 
         with open(config_file, "w", encoding="utf-8") as f:
-            yaml.dump(config_data, f)
+            f.write(json.dumps(config_data))
 
         with pytest.raises(ValueError):
             load_config(str(config_file))
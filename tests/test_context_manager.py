@@ -12,32 +12,36 @@ from clichat.llm_client import LLMClient
 class TestContextManager:
     """测试 ContextManager"""
 
-    @pytest.fixture
+    @pytest.fixture(scope="module")
     def llm_config(self):
-        """创建 LLM 配置"""
+        """创建 LLM 配置（配置对象测试间不修改，整个模块共享一份）"""
         return LLMConfig(
             api_base="http://localhost:11434/v1",
             model="test-model",
             max_tokens=2000,
         )
 
-    @pytest.fixture
+    @pytest.fixture(scope="module")
     def app_config(self):
-        """创建应用配置"""
+        """创建应用配置（同上，模块级共享）"""
         return AppConfig(
             history_dir="/tmp/test",
             compress_threshold=0.85,
             compress_summary_tokens=300,
         )
 
-    @pytest.fixture
+    @pytest.fixture(scope="module")
     def llm_client(self, llm_config):
-        """创建 LLM 客户端"""
+        """创建 LLM 客户端
+
+        客户端本身无测试间状态（需要 chat 行为的测试各自替换 mock），
+        模块级共享避免每个用例都新建一个 httpx 连接池。
+        """
         return LLMClient(llm_config)
 
     @pytest.fixture
     def manager(self, app_config, llm_client):
-        """创建 ContextManager 实例"""
+        """创建 ContextManager 实例（持有压缩缓存，必须每个用例新建）"""
         return ContextManager(app_config, llm_client)
 
     def create_session(self, message_count: int, tokens_per_message: int = 50) -> dict:
@@ -16,12 +16,86 @@ from clichat.config import LLMConfig
 from clichat.llm_client import LLMClient
 
 
+def _make_chunk(chunk_id: str, content, role=None, finish_reason=None, created=1234567890):
+    """构造一个流式响应 chunk（pydantic 校验开销集中在模块导入时一次完成）"""
+    return ChatCompletionChunk(
+        id=chunk_id,
+        model="test-model",
+        object="chat.completion.chunk",
+        created=created,
+        choices=[
+            ChunkChoice(
+                index=0,
+                delta=ChoiceDelta(content=content, role=role),
+                finish_reason=finish_reason,
+            )
+        ],
+    )
+
+
+# 各用例共享的 chunk 序列：对象只读，测试间复用，生成器每次新建
+_SUCCESS_CHUNKS = (
+    _make_chunk("chunk1", "Hello", role="assistant"),
+    _make_chunk("chunk2", " world", created=1234567891),
+    _make_chunk("chunk3", "!", finish_reason="stop", created=1234567892),
+)
+
+_EMPTY_DELTA_CHUNKS = (
+    _make_chunk("chunk1", "Hello", role="assistant"),
+    _make_chunk("chunk2", None, created=1234567891),  # 空内容
+    _make_chunk("chunk3", " world", finish_reason="stop", created=1234567892),
+)
+
+
+def _make_completion(content: str) -> ChatCompletion:
+    """构造一个非流式响应（与 _make_chunk 对应，集中重复的模型字面量）"""
+    return ChatCompletion(
+        id="completion1",
+        model="test-model",
+        object="chat.completion",
+        created=1234567890,
+        choices=[
+            CompletionChoice(
+                index=0,
+                message=ChatCompletionMessage(role="assistant", content=content),
+                finish_reason="stop",
+            )
+        ],
+    )
+
+
+async def _collect_stream(client, chunks):
+    """跑一次流式对话：mock create 返回给定 chunk 序列，收集回调输出
+
+    返回 (最终结果, 收到的 chunk 列表)，供各流式用例共用同一套
+    patch / 回调脚手架。
+    """
+    # 用普通 async 函数替身而不是 AsyncMock：生产代码只是 await create
+    # 后 async for 迭代返回值，不需要 mock 的调用记录 / spec 检查开销
+    async def mock_create(*args, **kwargs):
+        async def stream():
+            for chunk in chunks:
+                yield chunk
+
+        return stream()
+
+    with patch.object(client.client.chat.completions, "create", mock_create):
+        received_chunks = []
+
+        async def on_chunk(chunk: str):
+            received_chunks.append(chunk)
+
+        messages = [{"role": "user", "content": "Test"}]
+        result = await client.chat_stream(messages, on_chunk)
+        return result, received_chunks
+
+
 class TestLLMClient:
     """测试 LLMClient"""
 
-    @pytest.fixture
+    @pytest.fixture(scope="module")
     def config(self):
-        """创建测试配置"""
+        """创建测试配置（测试间不修改，模块级共享）"""
         return LLMConfig(
             api_base="http://localhost:11434/v1",
             model="test-model",
@@ -30,12 +104,33 @@ class TestLLMClient:
             max_tokens=2000,
         )
 
-    @pytest.fixture
+    @pytest.fixture(scope="module")
     def client(self, config):
-        """创建 LLMClient 实例"""
+        """创建 LLMClient 实例
+
+        所有用例都通过 patch.object 替换 create（上下文退出自动还原），
+        客户端本身无测试间状态，共享一个实例省掉重复的连接池构建。
+        """
         return LLMClient(config)
 
-    @pytest.mark.asyncio
+    @pytest.fixture
+    def patched_create(self, client):
+        """patch 共享 client 的 create 方法的工厂
+
+        用例只需声明 return_value / side_effect，省掉每处重复的
+        patch.object 目标和 new_callable 样板。
+        """
+        def _patch(**kwargs):
+            return patch.object(
+                client.client.chat.completions,
+                "create",
+                new_callable=AsyncMock,
+                **kwargs,
+            )
+
+        return _patch
+
+    @pytest.mark.asyncio(loop_scope="module")
     async def test_init(self, config):
         """测试初始化"""
         client = LLMClient(config)
@@ -43,223 +138,43 @@ class TestLLMClient:
         assert isinstance(client.client, AsyncOpenAI)
         await client.close()
 
-    @pytest.mark.asyncio
+    @pytest.mark.asyncio(loop_scope="module")
     async def test_chat_stream_success(self, client):
         """测试流式对话成功"""
-        # 创建 mock chunks
-        mock_chunks = [
-            ChatCompletionChunk(
-                id="chunk1",
-                model="test-model",
-                object="chat.completion.chunk",
-                created=1234567890,
-                choices=[
-                    ChunkChoice(
-                        index=0,
-                        delta=ChoiceDelta(content="Hello", role="assistant"),
-                        finish_reason=None,
-                    )
-                ],
-            ),
-            ChatCompletionChunk(
-                id="chunk2",
-                model="test-model",
-                object="chat.completion.chunk",
-                created=1234567891,
-                choices=[
-                    ChunkChoice(
-                        index=0,
-                        delta=ChoiceDelta(content=" world", role=None),
-                        finish_reason=None,
-                    )
-                ],
-            ),
-            ChatCompletionChunk(
-                id="chunk3",
-                model="test-model",
-                object="chat.completion.chunk",
-                created=1234567892,
-                choices=[
-                    ChunkChoice(
-                        index=0,
-                        delta=ChoiceDelta(content="!", role=None),
-                        finish_reason="stop",
-                    )
-                ],
-            ),
-        ]
-
-        # Mock 异步迭代器
-        async def mock_stream():
-            for chunk in mock_chunks:
-                yield chunk
-
-        # Mock create 方法
-        with patch.object(
-            client.client.chat.completions,
-            "create",
-            new_callable=AsyncMock,
-            return_value=mock_stream(),
-        ):
-            # 收集 chunks
-            received_chunks = []
-
-            async def on_chunk(chunk: str):
-                received_chunks.append(chunk)
-
-            # 调用
-            messages = [{"role": "user", "content": "Test"}]
-            result = await client.chat_stream(messages, on_chunk)
+        result, received_chunks = await _collect_stream(client, _SUCCESS_CHUNKS)
 
-            # 验证最终结果
-            assert result == "Hello world!"
-            # 验证所有 chunks 拼接后的结果正确
-            assert "".join(received_chunks) == "Hello world!"
-            # 验证至少收到了一些 chunks
-            assert len(received_chunks) > 0
+        # 验证最终结果
+        assert result == "Hello world!"
+        # 验证所有 chunks 拼接后的结果正确
+        assert "".join(received_chunks) == "Hello world!"
+        # 验证至少收到了一些 chunks
+        assert len(received_chunks) > 0
 
-    @pytest.mark.asyncio
+    @pytest.mark.asyncio(loop_scope="module")
     async def test_chat_stream_empty_delta(self, client):
         """测试处理空的 delta 内容"""
-        mock_chunks = [
-            ChatCompletionChunk(
-                id="chunk1",
-                model="test-model",
-                object="chat.completion.chunk",
-                created=1234567890,
-                choices=[
-                    ChunkChoice(
-                        index=0,
-                        delta=ChoiceDelta(content="Hello", role="assistant"),
-                        finish_reason=None,
-                    )
-                ],
-            ),
-            ChatCompletionChunk(
-                id="chunk2",
-                model="test-model",
-                object="chat.completion.chunk",
-                created=1234567891,
-                choices=[
-                    ChunkChoice(
-                        index=0,
-                        delta=ChoiceDelta(content=None, role=None),  # 空内容
-                        finish_reason=None,
-                    )
-                ],
-            ),
-            ChatCompletionChunk(
-                id="chunk3",
-                model="test-model",
-                object="chat.completion.chunk",
-                created=1234567892,
-                choices=[
-                    ChunkChoice(
-                        index=0,
-                        delta=ChoiceDelta(content=" world", role=None),
-                        finish_reason="stop",
-                    )
-                ],
-            ),
-        ]
-
-        async def mock_stream():
-            for chunk in mock_chunks:
-                yield chunk
-
-        with patch.object(
-            client.client.chat.completions,
-            "create",
-            new_callable=AsyncMock,
-            return_value=mock_stream(),
-        ):
-            received_chunks = []
-
-            async def on_chunk(chunk: str):
-                received_chunks.append(chunk)
-
-            messages = [{"role": "user", "content": "Test"}]
-            result = await client.chat_stream(messages, on_chunk)
-
-            # 空内容应该被跳过
-            assert result == "Hello world"
-            assert received_chunks == ["Hello", " world"]
-
-    @pytest.mark.asyncio
-    async def test_chat_stream_api_error(self, client):
-        """测试 API 错误处理"""
-        # Mock API 错误
-        with patch.object(
-            client.client.chat.completions,
-            "create",
-            new_callable=AsyncMock,
-            side_effect=Exception("API Error"),
-        ):
-            async def on_chunk(chunk: str):
-                pass
-
-            messages = [{"role": "user", "content": "Test"}]
+        result, received_chunks = await _collect_stream(client, _EMPTY_DELTA_CHUNKS)
 
-            with pytest.raises(Exception, match="LLM API 调用失败"):
-                await client.chat_stream(messages, on_chunk)
+        # 空内容应该被跳过（chunk 可能被合批，只校验拼接结果）
+        assert result == "Hello world"
+        assert "".join(received_chunks) == "Hello world"
 
-    @pytest.mark.asyncio
-    async def test_chat_success(self, client):
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_chat_success(self, client, patched_create):
         """测试非流式对话成功"""
         # Mock 响应
-        mock_response = ChatCompletion(
-            id="completion1",
-            model="test-model",
-            object="chat.completion",
-            created=1234567890,
-            choices=[
-                CompletionChoice(
-                    index=0,
-                    message=ChatCompletionMessage(
-                        role="assistant", content="Hello from LLM"
-                    ),
-                    finish_reason="stop",
-                )
-            ],
-        )
-
-        with patch.object(
-            client.client.chat.completions,
-            "create",
-            new_callable=AsyncMock,
-            return_value=mock_response,
-        ):
+        with patched_create(return_value=_make_completion("Hello from LLM")):
             messages = [{"role": "user", "content": "Test"}]
             result = await client.chat(messages)
 
             assert result == "Hello from LLM"
 
-    @pytest.mark.asyncio
-    async def test_chat_with_think_tags(self, client):
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_chat_with_think_tags(self, client, patched_create):
         """测试非流式对话过滤 think 标签"""
         # Mock 响应包含 think 标签
-        mock_response = ChatCompletion(
-            id="completion1",
-            model="test-model",
-            object="chat.completion",
-            created=1234567890,
-            choices=[
-                CompletionChoice(
-                    index=0,
-                    message=ChatCompletionMessage(
-                        role="assistant",
-                        content="<think>internal reasoning</think>Hello from LLM"
-                    ),
-                    finish_reason="stop",
-                )
-            ],
-        )
-
-        with patch.object(
-            client.client.chat.completions,
-            "create",
-            new_callable=AsyncMock,
-            return_value=mock_response,
+        with patched_create(
+            return_value=_make_completion("<think>internal reasoning</think>Hello from LLM")
         ):
             messages = [{"role": "user", "content": "Test"}]
             result = await client.chat(messages)
@@ -268,22 +183,64 @@ class TestLLMClient:
             assert result == "Hello from LLM"
             assert "<think>" not in result
 
-    @pytest.mark.asyncio
-    async def test_chat_api_error(self, client):
-        """测试非流式对话 API 错误"""
-        with patch.object(
-            client.client.chat.completions,
-            "create",
-            new_callable=AsyncMock,
-            side_effect=Exception("API Error"),
-        ):
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_chat_stream_on_chunk_error(self, client):
+        """测试 on_chunk 回调抛错时收尾：关闭 HTTP 流并包装异常"""
+        class _FakeStream:
+            """带 close() 的假流（async 生成器没有 close，无法验证收尾）"""
+
+            def __init__(self, chunks):
+                self._it = iter(chunks)
+                self.closed = False
+
+            def __aiter__(self):
+                return self
+
+            async def __anext__(self):
+                try:
+                    return next(self._it)
+                except StopIteration:
+                    raise StopAsyncIteration
+
+            async def close(self):
+                self.closed = True
+
+        fake_stream = _FakeStream(_SUCCESS_CHUNKS)
+
+        async def mock_create(*args, **kwargs):
+            return fake_stream
+
+        async def on_chunk(chunk: str):
+            raise RuntimeError("render failed")
+
+        with patch.object(client.client.chat.completions, "create", mock_create):
             messages = [{"role": "user", "content": "Test"}]
 
             with pytest.raises(Exception, match="LLM API 调用失败"):
-                await client.chat(messages)
+                await client.chat_stream(messages, on_chunk)
+
+        # 错误路径必须关闭流，否则连接泄漏
+        assert fake_stream.closed
 
-    @pytest.mark.asyncio
-    async def test_close(self, client):
-        """测试关闭客户端"""
+    @pytest.mark.asyncio(loop_scope="module")
+    @pytest.mark.parametrize("method_name", ["chat", "chat_stream"])
+    async def test_api_error(self, client, patched_create, method_name):
+        """测试 API 错误处理：流式与非流式都包装为 LLM API 调用失败"""
+        with patched_create(side_effect=Exception("API Error")):
+            messages = [{"role": "user", "content": "Test"}]
+
+            async def on_chunk(chunk: str):
+                pass
+
+            with pytest.raises(Exception, match="LLM API 调用失败"):
+                if method_name == "chat":
+                    await client.chat(messages)
+                else:
+                    await client.chat_stream(messages, on_chunk)
+
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_close(self, config):
+        """测试关闭客户端（用独立实例，不动模块级共享的 client）"""
+        client = LLMClient(config)
         await client.close()
         # 验证 client 已关闭（这里只是确保没有异常）
@@ -1,7 +1,9 @@
 """session_manager.py 的单元测试"""
 
+import itertools
 import json
-import time
+import uuid
+from datetime import datetime, timedelta
 from pathlib import Path
 
 import pytest
@@ -12,16 +14,38 @@ from clichat.session_manager import SessionManager
 class TestSessionManager:
     """测试 SessionManager"""
 
+    @pytest.fixture(scope="module")
+    def base_history_dir(self, tmp_path_factory):
+        """模块级共享的临时根目录（每个用例在其下用独立子目录隔离）"""
+        return tmp_path_factory.mktemp("session_history")
+
     @pytest.fixture
-    def temp_history_dir(self, tmp_path):
+    def temp_history_dir(self, base_history_dir):
         """创建临时历史目录"""
-        return str(tmp_path / "test_history")
+        return str(base_history_dir / uuid.uuid4().hex)
 
     @pytest.fixture
     def manager(self, temp_history_dir):
         """创建 SessionManager 实例"""
         return SessionManager(temp_history_dir)
 
+    @pytest.fixture
+    def fake_clock(self, monkeypatch):
+        """单调递增的假时钟
+
+        每次 now() 前进 1 毫秒，保证会话 ID / 时间戳互不相同，
+        替代靠 time.sleep 等出来的真实时间差。
+        """
+        base = datetime(2025, 1, 1, 12, 0, 0)
+        ticks = itertools.count()
+
+        class _FakeDatetime(datetime):
+            @classmethod
+            def now(cls, tz=None):
+                return base + timedelta(milliseconds=next(ticks))
+
+        monkeypatch.setattr("clichat.session_manager.datetime", _FakeDatetime)
+
     def test_init_creates_directory(self, temp_history_dir):
         """测试初始化时创建目录"""
         manager = SessionManager(temp_history_dir)
@@ -127,17 +151,15 @@ class TestSessionManager:
         sessions = manager.list_sessions()
         assert sessions == []
 
-    def test_list_sessions(self, manager):
+    def test_list_sessions(self, manager, fake_clock):
         """测试列出会话"""
-        # 创建多个会话
+        # 创建多个会话（假时钟保证时间戳不同）
         id1 = manager.create_session("Prompt 1")
-        time.sleep(0.01)  # 确保时间戳不同
         id2 = manager.create_session("Prompt 2")
 
         # 添加消息以更新标题
         manager.save_message(id1, "user", "First chat")
         manager.update_title(id1, "First chat")
-        time.sleep(0.01)
         manager.save_message(id2, "user", "Second chat")
         manager.update_title(id2, "Second chat")
 
@@ -151,80 +173,88 @@ class TestSessionManager:
         assert sessions[0]["title"] == "Second chat"
         assert sessions[1]["title"] == "First chat"
 
-    def test_list_sessions_with_limit(self, manager):
+    def test_list_sessions_with_limit(self, manager, fake_clock):
         """测试限制列出会话数量"""
-        # 创建 3 个会话
+        # 创建 3 个会话（假时钟保证时间戳不同）
         for i in range(3):
             manager.create_session(f"Prompt {i}")
-            time.sleep(0.01)
 
         # 限制返回 2 个
         sessions = manager.list_sessions(limit=2)
         assert len(sessions) == 2
 
-    def test_search_sessions_by_title(self, manager):
-        """测试按标题搜索会话"""
-        id1 = manager.create_session("System")
-        id2 = manager.create_session("System")
-
-        manager.save_message(id1, "user", "Python tutorial")
-        manager.update_title(id1, "Python tutorial")
-        manager.save_message(id2, "user", "JavaScript guide")
-        manager.update_title(id2, "JavaScript guide")
-
-        # 搜索 "Python"
-        results = manager.search_sessions("Python")
-        assert len(results) == 1
-        assert results[0]["session_id"] == id1
-        assert results[0]["match_type"] == "title"
-
-    def test_search_sessions_by_content(self, manager):
-        """测试按内容搜索会话"""
-        id1 = manager.create_session("System")
-        manager.save_message(id1, "user", "First message")
-        manager.save_message(id1, "assistant", "I can help with Python programming")
-
-        # 搜索 "Python"
-        results = manager.search_sessions("Python")
-        assert len(results) == 1
-        assert results[0]["session_id"] == id1
-        assert results[0]["match_type"] == "content"
-        assert "match_preview" in results[0]
-
-    def test_search_sessions_case_insensitive(self, manager):
-        """测试搜索不区分大小写"""
-        session_id = manager.create_session("System")
-        manager.save_message(session_id, "user", "HELLO World")
-
-        # 使用小写搜索
-        results = manager.search_sessions("hello")
-        assert len(results) == 1
-
-        # 使用大写搜索
-        results = manager.search_sessions("WORLD")
-        assert len(results) == 1
-
-    def test_search_sessions_no_results(self, manager):
-        """测试搜索无结果"""
+    def test_list_sessions_skips_orphan_meta(self, manager):
+        """测试残留的 meta 边车（.json 已被手动删除）不产生幽灵会话"""
         session_id = manager.create_session("System")
-        manager.save_message(session_id, "user", "Test message")
-
-        results = manager.search_sessions("nonexistent")
-        assert results == []
+        (manager.history_dir / f"session_{session_id}.json").unlink()
+
+        # 仅剩 meta 边车时不应出现在列表里
+        assert (manager.history_dir / f"session_{session_id}.meta").exists()
+        assert manager.list_sessions() == []
+
+    @pytest.fixture(scope="module")
+    def populated_manager(self, base_history_dir):
+        """模块级共享的搜索语料：只读，各搜索用例复用同一份
+
+        一次构建三个会话，替代每个搜索用例各自建库：
+        - python: 标题含 "Python tutorial"
+        - js:     标题含 "JavaScript guide"
+        - hello:  标题不匹配，内容含 "HELLO World" 和 "Rust programming"
+        """
+        manager = SessionManager(str(base_history_dir / "search_corpus"))
+
+        id_python = manager.create_session("System")
+        manager.save_message(id_python, "user", "Python tutorial")
+        manager.update_title(id_python, "Python tutorial")
+
+        id_js = manager.create_session("System")
+        manager.save_message(id_js, "user", "JavaScript guide")
+        manager.update_title(id_js, "JavaScript guide")
+
+        id_hello = manager.create_session("System")
+        manager.save_message(id_hello, "user", "HELLO World")
+        manager.save_message(id_hello, "assistant", "I can help with Rust programming")
+
+        ids = {"python": id_python, "js": id_js, "hello": id_hello}
+        return manager, ids
+
+    @pytest.mark.parametrize(
+        "keyword, match_type, session_key",
+        [
+            pytest.param("Python", "title", "python", id="by_title"),
+            pytest.param("rust", "content", "hello", id="by_content"),
+            pytest.param("hello", "content", "hello", id="case_insensitive_lower"),
+            pytest.param("WORLD", "content", "hello", id="case_insensitive_upper"),
+            pytest.param("nonexistent", None, None, id="no_results"),
+        ],
+    )
+    def test_search_sessions(self, populated_manager, keyword, match_type, session_key):
+        """测试全文搜索：标题/内容匹配、大小写不敏感、无结果"""
+        manager, ids = populated_manager
+        results = manager.search_sessions(keyword)
+
+        if session_key is None:
+            assert results == []
+        else:
+            assert len(results) == 1
+            assert results[0]["session_id"] == ids[session_key]
+            assert results[0]["match_type"] == match_type
+            if match_type == "content":
+                assert "match_preview" in results[0]
 
     def test_delete_session(self, manager):
         """测试删除会话"""
         session_id = manager.create_session("System")
+        session_path = manager.history_dir / f"session_{session_id}.json"
 
-        # 验证会话存在
-        assert manager.load_session(session_id) is not None
+        # 验证会话文件存在（直接看文件，不必整份 load + 解析）
+        assert session_path.exists()
 
         # 删除会话
         manager.delete_session(session_id)
 
-        # 验证会话已删除
-        with pytest.raises(FileNotFoundError):
-            manager.load_session(session_id)
+        # 验证会话文件已删除
+        assert not session_path.exists()
 
     def test_delete_nonexistent_session(self, manager):
         """测试删除不存在的会话"""